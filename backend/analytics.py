@@ -0,0 +1,168 @@
+from datetime import date, datetime, timedelta
+
+import charts
+import rollups
+from categories import categories_for
+from errors import ApiError
+from models import TransactionRollup, db
+from money import to_major
+from sqlalchemy import func, select
+
+
+# Reads the period, month and year filters shared by the listing and analytics
+# endpoints from request args. The year stops short of date.max so the end of
+# a yearly range is still a valid date.
+def period_args(args):
+    period = args.get("period")
+    month = args.get("month", type=int)
+    year = args.get("year", type=int, default=datetime.now().year)
+    if month is not None and not 1 <= month <= 12:
+        raise ApiError("Month must be between 1 and 12")
+    if not 1900 <= year <= 9998:
+        raise ApiError("Year must be between 1900 and 9998")
+    return period, month, year
+
+
+# Period filters are half-open date ranges so they can use the
+# (user_id, date) indexes instead of wrapping the column in EXTRACT()
+def period_range(period, month, year):
+    if period == "monthly" and month:
+        start = date(year, month, 1)
+        end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+        return start, end
+    if period == "yearly":
+        return date(year, 1, 1), date(year + 1, 1, 1)
+    return None
+
+
+# Totals are summed as integer cents and only converted on the way out
+def summary_payload(expenses_cents, revenues_cents):
+    return {
+        "total_expenses": to_major(expenses_cents),
+        "total_revenues": to_major(revenues_cents),
+        "balance": to_major(revenues_cents - expenses_cents),
+    }
+
+
+# Statements are built separately from their execution so the async server
+# (asgi.py) can run the same queries on its own sessions
+def summary_statement(user_id, period, month, year):
+    stmt = select(
+        TransactionRollup.type, func.sum(TransactionRollup.total_cents)
+    ).where(TransactionRollup.user_id == user_id)
+    stmt = rollups.apply_period_filter(stmt, period, month, year)
+    return stmt.group_by(TransactionRollup.type)
+
+
+def summary_from_rows(rows):
+    totals = dict(rows)
+    return summary_payload(totals.get("expense") or 0, totals.get("revenue") or 0)
+
+
+def summarize(user_id, period, month, year):
+    rows = db.session.execute(summary_statement(user_id, period, month, year))
+    return summary_from_rows(rows.all())
+
+
+# Resolves chart parameters to a half-open [start, end) range; explicit
+# start/end (inclusive) override the calendar period
+def chart_range(period, month, year, start_arg, end_arg, granularity):
+    if start_arg or end_arg:
+        if not (start_arg and end_arg):
+            raise ApiError("Both start and end are required")
+        try:
+            start = datetime.strptime(start_arg, "%Y-%m-%d").date()
+            end = datetime.strptime(end_arg, "%Y-%m-%d").date() + timedelta(days=1)
+        except ValueError:
+            raise ApiError("Dates must be in YYYY-MM-DD format")
+        if end <= start:
+            raise ApiError("End must not be before start")
+        short_labels = False
+        granularity = granularity or "day"
+    elif period == "monthly" and month:
+        start, end = period_range(period, month, year)
+        short_labels = True
+        granularity = granularity or "day"
+    else:
+        start, end = period_range("yearly", month, year)
+        short_labels = True
+        granularity = granularity or "month"
+
+    if granularity not in charts.GRANULARITIES:
+        raise ApiError("Granularity must be one of day, week or month")
+
+    return start, end, granularity, short_labels
+
+
+def chart_buckets(start, end, granularity):
+    try:
+        return charts.bucket_starts(start, end, granularity)
+    except ValueError as e:
+        raise ApiError(str(e))
+
+
+def aggregate_statement(user_id, start, end):
+    return select(
+        TransactionRollup.date,
+        TransactionRollup.category_id,
+        TransactionRollup.type,
+        TransactionRollup.total_cents,
+    ).where(
+        TransactionRollup.user_id == user_id,
+        TransactionRollup.date >= start,
+        TransactionRollup.date < end,
+    )
+
+
+# One pass over the daily rollup rows in [start, end) fills the summary
+# totals, the category breakdown and the (gap-filled) timeline buckets;
+# lookup(ids) must return a category map covering the given ids
+def aggregate_rows(rows, buckets, granularity, short_labels, lookup):
+    timeline = {bucket: [0, 0] for bucket in buckets}
+    expenses_by_category = {}
+    for row in rows:
+        totals = timeline[charts.bucket_start(row.date, granularity)]
+        if row.type == "expense":
+            totals[0] += row.total_cents
+            expenses_by_category[row.category_id] = (
+                expenses_by_category.get(row.category_id, 0) + row.total_cents
+            )
+        else:
+            totals[1] += row.total_cents
+
+    categories = lookup(expenses_by_category)
+    category_data = []
+    for category_id in sorted(expenses_by_category):
+        category = categories[category_id]
+        category_data.append(
+            {
+                "category": category["name"],
+                "icon": category["icon"],
+                "amount": to_major(expenses_by_category[category_id]),
+            }
+        )
+
+    timeline_data = [
+        {
+            "period": charts.bucket_label(bucket, granularity, short_labels),
+            "start": bucket.isoformat(),
+            "expenses": to_major(expenses),
+            "revenues": to_major(revenues),
+        }
+        for bucket, (expenses, revenues) in timeline.items()
+    ]
+
+    summary = summary_payload(
+        sum(expenses for expenses, _ in timeline.values()),
+        sum(revenues for _, revenues in timeline.values()),
+    )
+    return summary, {
+        "expenses_by_category": category_data,
+        "timeline": timeline_data,
+    }
+
+
+def aggregate(user_id, start, end, granularity, short_labels):
+    buckets = chart_buckets(start, end, granularity)
+    rows = db.session.execute(aggregate_statement(user_id, start, end))
+    return aggregate_rows(rows, buckets, granularity, short_labels, categories_for)
@@ -1,21 +1,230 @@
+import csv
+import io
 import os
+import threading
 from datetime import datetime, timedelta
 from functools import wraps
 
+import bulk
+import changes
+import compression
+import database
+import events
+import export
+import jobs
 import jwt
-from flask import Flask, jsonify, request
+import listing
+import metrics
+import ratelimit
+import rollups
+import search
+import slow_queries
+import thresholds
+import versions
+from analytics import aggregate, chart_range, period_args, period_range, summarize
+from auth_cache import snapshot_user, token_cache
+from categories import categories_for, get_category, invalidate_category_map
+from errors import ApiError
+from flask import (
+    Flask,
+    Response,
+    jsonify,
+    make_response,
+    request,
+    send_file,
+    stream_with_context,
+)
 from flask_cors import CORS
-from models import Category, Transaction, User, db
-from sqlalchemy import extract, func
-from werkzeug.security import check_password_hash, generate_password_hash
+from hashing import password_hasher
+from json_provider import OrjsonProvider
+from models import Category, ReportJob, Transaction, User, db
+from money import to_major, to_minor
+from serializers import serialize_transaction
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.config["SECRET_KEY"] = "your-secret-key-change-in-production"
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///antigravity.db"
+app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get(
+    "DATABASE_URL", "sqlite:///antigravity.db"
+)
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-
-CORS(app)
+app.config["SQLITE_JOURNAL_MODE"] = os.environ.get("SQLITE_JOURNAL_MODE", "WAL")
+app.config["SQLITE_SYNCHRONOUS"] = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+app.config["SQLITE_BUSY_TIMEOUT_MS"] = int(
+    os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 5000)
+)
+app.config["SQLITE_MMAP_SIZE"] = int(os.environ.get("SQLITE_MMAP_SIZE", 268435456))
+app.config["SQLITE_CACHE_SIZE"] = int(os.environ.get("SQLITE_CACHE_SIZE", -65536))
+app.config["DB_POOL_SIZE"] = int(os.environ.get("DB_POOL_SIZE", 10))
+app.config["DB_MAX_OVERFLOW"] = int(os.environ.get("DB_MAX_OVERFLOW", 20))
+app.config["DB_POOL_PRE_PING"] = os.environ.get("DB_POOL_PRE_PING", "1") == "1"
+app.config["DB_POOL_RECYCLE"] = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = database.engine_options(app.config)
+app.config["AUTH_CACHE_SIZE"] = int(os.environ.get("AUTH_CACHE_SIZE", 10000))
+app.config["AUTH_CACHE_TTL"] = int(os.environ.get("AUTH_CACHE_TTL", 300))
+app.config["PASSWORD_HASH_ITERATIONS"] = int(
+    os.environ.get("PASSWORD_HASH_ITERATIONS", 600000)
+)
+app.config["PASSWORD_HASH_WORKERS"] = int(os.environ.get("PASSWORD_HASH_WORKERS", 2))
+app.config["PASSWORD_HASH_QUEUE"] = int(os.environ.get("PASSWORD_HASH_QUEUE", 8))
+app.config["METRICS_ENABLED"] = os.environ.get("METRICS_ENABLED", "1") == "1"
+app.config["SLOW_QUERY_MS"] = float(os.environ.get("SLOW_QUERY_MS", 250))
+app.config["COMPRESSION_ENABLED"] = os.environ.get("COMPRESSION_ENABLED", "1") == "1"
+app.config["COMPRESSION_MIN_SIZE"] = int(os.environ.get("COMPRESSION_MIN_SIZE", 1024))
+app.config["REPORT_WORKERS"] = int(os.environ.get("REPORT_WORKERS", 2))
+app.config["REPORT_MAX_PENDING"] = int(os.environ.get("REPORT_MAX_PENDING", 3))
+app.config["REPORT_RETENTION_HOURS"] = float(
+    os.environ.get("REPORT_RETENTION_HOURS", 24)
+)
+app.config["TOMBSTONE_RETENTION_DAYS"] = float(
+    os.environ.get("TOMBSTONE_RETENTION_DAYS", 30)
+)
+app.config["REPORTS_DIR"] = os.environ.get(
+    "REPORTS_DIR", os.path.join(app.instance_path, "reports")
+)
+app.config["STREAM_HEARTBEAT_SECONDS"] = float(
+    os.environ.get("STREAM_HEARTBEAT_SECONDS", 15)
+)
+app.config["STREAM_MAX_CONNECTIONS"] = int(
+    os.environ.get("STREAM_MAX_CONNECTIONS", 10000)
+)
+app.config["STREAM_QUEUE_SIZE"] = int(os.environ.get("STREAM_QUEUE_SIZE", 64))
+app.config["RATE_LIMIT_ENABLED"] = os.environ.get("RATE_LIMIT_ENABLED", "1") == "1"
+app.config["RATE_LIMITS"] = {
+    route_class: ratelimit.parse_limit(
+        os.environ.get(f"RATE_LIMIT_{route_class.upper()}", default)
+    )
+    for route_class, default in [
+        ("auth", "10/60"),
+        ("reads", "600/60"),
+        ("writes", "120/60"),
+        ("exports", "10/60"),
+    ]
+}
+app.config["MAX_IN_FLIGHT"] = int(os.environ.get("MAX_IN_FLIGHT", 128))
+app.config["ADMIN_USERS"] = {
+    username for username in os.environ.get("ADMIN_USERS", "").split(",") if username
+}
+
+# ETag must be exposed for the frontend to revalidate cross-origin reads
+CORS(app, expose_headers=["ETag"])
 db.init_app(app)
+with app.app_context():
+    database.init_engine(db.engine, app.config)
+
+token_cache.maxsize = app.config["AUTH_CACHE_SIZE"]
+token_cache.ttl = app.config["AUTH_CACHE_TTL"]
+password_hasher.iterations = app.config["PASSWORD_HASH_ITERATIONS"]
+password_hasher.workers = app.config["PASSWORD_HASH_WORKERS"]
+password_hasher.max_pending = app.config["PASSWORD_HASH_QUEUE"]
+jobs.report_runner.workers = app.config["REPORT_WORKERS"]
+jobs.report_runner.retention = timedelta(hours=app.config["REPORT_RETENTION_HOURS"])
+changes.retention = timedelta(days=app.config["TOMBSTONE_RETENTION_DAYS"])
+events.broker.max_subscribers = app.config["STREAM_MAX_CONNECTIONS"]
+events.broker.max_pending = app.config["STREAM_QUEUE_SIZE"]
+if app.config["RATE_LIMIT_ENABLED"]:
+    ratelimit.rate_limiter.limits = app.config["RATE_LIMITS"]
+ratelimit.admission.max_in_flight = app.config["MAX_IN_FLIGHT"]
+
+
+def auth_metrics():
+    stats = token_cache.stats()
+    return [
+        ("auth_token_cache_hits_total", "counter", "Token cache hits", stats["hits"]),
+        (
+            "auth_token_cache_misses_total",
+            "counter",
+            "Token cache misses",
+            stats["misses"],
+        ),
+        ("auth_token_cache_size", "gauge", "Cached tokens", stats["size"]),
+        (
+            "password_hash_rejected_total",
+            "counter",
+            "Hashing calls shed by admission control",
+            password_hasher.rejected,
+        ),
+    ]
+
+
+def stream_metrics():
+    stats = events.broker.stats()
+    return [
+        ("stream_connections", "gauge", "Open event streams", stats["connections"]),
+        (
+            "stream_events_published_total",
+            "counter",
+            "Live events published",
+            stats["published"],
+        ),
+        (
+            "stream_resyncs_total",
+            "counter",
+            "Streams that fell behind and were told to reload",
+            stats["resyncs"],
+        ),
+    ]
+
+
+def limiter_metrics():
+    stats = ratelimit.rate_limiter.stats()
+    collected = [
+        ("rate_limit_buckets", "gauge", "Tracked rate limit buckets", stats["buckets"])
+    ]
+    for route_class, rejected in stats["rejected"].items():
+        collected.append(
+            (
+                f"rate_limit_{route_class}_rejected_total",
+                "counter",
+                f"{route_class.capitalize()} requests rejected with 429",
+                rejected,
+            )
+        )
+    collected.extend(
+        [
+            (
+                "admission_in_flight",
+                "gauge",
+                "Requests admitted and not yet finished",
+                ratelimit.admission.in_flight,
+            ),
+            (
+                "admission_rejected_total",
+                "counter",
+                "Requests shed with 503 by the in-flight cap",
+                ratelimit.admission.rejected,
+            ),
+        ]
+    )
+    return collected
+
+
+if app.config["METRICS_ENABLED"]:
+    with app.app_context():
+        metrics.init_app(app, db.engine)
+    metrics.registry.add_collector(auth_metrics)
+    metrics.registry.add_collector(stream_metrics)
+    metrics.registry.add_collector(limiter_metrics)
+
+if app.config["RATE_LIMIT_ENABLED"] or app.config["MAX_IN_FLIGHT"] > 0:
+    ratelimit.init_app(app)
+
+if app.config["COMPRESSION_ENABLED"]:
+    compression.init_app(app, app.config["COMPRESSION_MIN_SIZE"])
+
+if app.config["SLOW_QUERY_MS"] > 0:
+    with app.app_context():
+        slow_queries.init_app(app, db.engine, app.config["SLOW_QUERY_MS"])
+
+
+DASHBOARD_PAGE_SIZE = 10
+
+
+def list_transactions(user, args, date_range=None):
+    stmt, limit, response_format = listing.page_statement(user.id, args, date_range)
+    transactions = db.session.execute(stmt).all()
+    categories = categories_for({t.category_id for t in transactions})
+    return listing.page_response(transactions, limit, response_format, categories)
 
 
 # Token required decorator
@@ -30,20 +239,67 @@ def token_required(f):
         try:
             if token.startswith("Bearer "):
                 token = token[7:]
-            data = jwt.decode(token, app.config["SECRET_KEY"], algorithms=["HS256"])
-            current_user = User.query.get(data["user_id"])
-            if not current_user:
-                return jsonify({"message": "User not found"}), 401
+
+            # Fast path: a recently verified token skips both the signature
+            # check and the user lookup
+            current_user = token_cache.get(token)
+            if current_user is None:
+                data = jwt.decode(
+                    token, app.config["SECRET_KEY"], algorithms=["HS256"]
+                )
+                user = db.session.get(User, data["user_id"])
+                if not user:
+                    return jsonify({"message": "User not found"}), 401
+                current_user = snapshot_user(user)
+                token_cache.put(token, current_user, data.get("exp"))
         except jwt.ExpiredSignatureError:
             return jsonify({"message": "Token has expired"}), 401
         except jwt.InvalidTokenError:
             return jsonify({"message": "Invalid token"}), 401
 
+        try:
+            ratelimit.rate_limiter.check(
+                current_user.id,
+                ratelimit.route_class(request.endpoint, request.method),
+            )
+        except ApiError as e:
+            return jsonify({"message": e.message}), e.status_code, e.headers
+
         return f(current_user, *args, **kwargs)
 
     return decorated
 
 
+# Conditional GET for read endpoints (use below token_required): the weak
+# ETag comes from the user's data version, so an unchanged client copy is
+# confirmed with a 304 before any query for the response body runs
+def conditional(f):
+    @wraps(f)
+    def decorated(current_user, *args, **kwargs):
+        tag = versions.etag(current_user.id, request.path, request.args)
+        if request.if_none_match.contains_weak(tag):
+            response = Response(status=304)
+        else:
+            response = make_response(f(current_user, *args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+        response.set_etag(tag, weak=True)
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
+
+    return decorated
+
+
+# Monitoring endpoint (Prometheus text format)
+@app.route("/metrics", methods=["GET"])
+def get_metrics():
+    if not app.config["METRICS_ENABLED"]:
+        return jsonify({"message": "Metrics are disabled"}), 404
+
+    return Response(metrics.registry.render(), mimetype="text/plain; version=0.0.4")
+
+
 # Authentication endpoints
 @app.route("/api/login", methods=["POST"])
 def login():
@@ -57,9 +313,15 @@ def login():
 
         user = User.query.filter_by(username=username).first()
 
-        if not user or not check_password_hash(user.password_hash, password):
+        if not user or not password_hasher.verify(user.password_hash, password):
             return jsonify({"message": "Invalid username or password"}), 401
 
+        # Upgrade hashes made with an older work factor while we have the
+        # plaintext password at hand
+        if password_hasher.needs_rehash(user.password_hash):
+            user.password_hash = password_hasher.hash(password)
+            db.session.commit()
+
         token = jwt.encode(
             {"user_id": user.id, "exp": datetime.utcnow() + timedelta(days=7)},
             app.config["SECRET_KEY"],
@@ -76,15 +338,20 @@ def login():
                     "age": user.age,
                     "occupation": user.occupation,
                     "family_situation": user.family_situation,
-                    "monthly_spending_threshold": float(user.monthly_spending_threshold)
-                    if user.monthly_spending_threshold
+                    "monthly_spending_threshold": to_major(
+                        user.monthly_spending_threshold_cents
+                    )
+                    if user.monthly_spending_threshold_cents
                     else None,
                     "financial_goal": user.financial_goal,
                 },
             }
         ), 200
 
+    except ApiError as e:
+        return jsonify({"message": e.message}), e.status_code, e.headers
     except Exception as e:
+        db.session.rollback()
         return jsonify({"message": f"An error occurred: {str(e)}"}), 500
 
 
@@ -112,7 +379,16 @@ def register():
         if User.query.filter_by(email=email).first():
             return jsonify({"message": "Email already exists"}), 400
 
-        hashed_password = generate_password_hash(password)
+        threshold_cents = None
+        if monthly_spending_threshold is not None:
+            try:
+                threshold_cents = to_minor(monthly_spending_threshold)
+            except ValueError:
+                return jsonify(
+                    {"message": "Monthly spending threshold must be a number"}
+                ), 400
+
+        hashed_password = password_hasher.hash(password)
         new_user = User(
             username=username,
             email=email,
@@ -120,7 +396,7 @@ def register():
             age=age,
             occupation=occupation,
             family_situation=family_situation,
-            monthly_spending_threshold=monthly_spending_threshold,
+            monthly_spending_threshold_cents=threshold_cents,
             financial_goal=financial_goal,
         )
 
@@ -129,6 +405,8 @@ def register():
 
         return jsonify({"message": "User created successfully"}), 201
 
+    except ApiError as e:
+        return jsonify({"message": e.message}), e.status_code, e.headers
     except Exception as e:
         db.session.rollback()
         return jsonify({"message": f"An error occurred: {str(e)}"}), 500
@@ -137,52 +415,87 @@ def register():
 # Transaction endpoints
 @app.route("/api/transactions", methods=["GET"])
 @token_required
+@conditional
 def get_transactions(current_user):
     try:
-        # Get query parameters for filtering
-        category_id = request.args.get("category_id", type=int)
-        transaction_type = request.args.get("type")
-        period = request.args.get("period")  # 'monthly' or 'yearly'
-        month = request.args.get("month", type=int)
-        year = request.args.get("year", type=int, default=datetime.now().year)
-
-        query = Transaction.query.filter_by(user_id=current_user.id)
-
-        # Apply filters
-        if category_id:
-            query = query.filter_by(category_id=category_id)
-
-        if transaction_type:
-            query = query.filter_by(type=transaction_type)
-
-        if period == "monthly" and month:
-            query = query.filter(
-                extract("month", Transaction.date) == month,
-                extract("year", Transaction.date) == year,
-            )
-        elif period == "yearly":
-            query = query.filter(extract("year", Transaction.date) == year)
+        return jsonify(list_transactions(current_user, request.args)), 200
+
+    except ApiError as e:
+        return jsonify({"message": e.message}), e.status_code, e.headers
+    except Exception as e:
+        return jsonify({"message": f"An error occurred: {str(e)}"}), 500
 
-        transactions = query.order_by(Transaction.date.desc()).all()
 
+@app.route("/api/transactions/changes", methods=["GET"])
+@token_required
+@conditional
+def get_transaction_changes(current_user):
+    try:
+        return jsonify(
+            changes.changes_payload(current_user.id, request.args.get("since"))
+        ), 200
+
+    except ApiError as e:
+        return jsonify({"message": e.message}), e.status_code, e.headers
+    except Exception as e:
+        return jsonify({"message": f"An error occurred: {str(e)}"}), 500
+
+
+@app.route("/api/transactions/search", methods=["GET"])
+@token_required
+@conditional
+def search_transactions(current_user):
+    try:
+        if search.is_supported() and not search.has_index():
+            return jsonify(
+                {"message": "Search index is missing, run: python search.py create"}
+            ), 503
+
+        stmt, limit, offset = search.search_statement(
+            current_user.id, request.args, db.engine.dialect.name
+        )
+        transactions = db.session.execute(stmt).all()
+
+        next_offset = None
+        if len(transactions) > limit:
+            transactions = transactions[:limit]
+            next_offset = offset + limit
+
+        categories = categories_for({t.category_id for t in transactions})
         return jsonify(
             {
                 "transactions": [
-                    {
-                        "id": t.id,
-                        "date": t.date.strftime("%Y-%m-%d"),
-                        "category_id": t.category_id,
-                        "category_name": t.category.name,
-                        "category_icon": t.category.icon,
-                        "description": t.description,
-                        "amount": float(t.amount),
-                        "type": t.type,
-                    }
-                    for t in transactions
-                ]
+                    serialize_transaction(t, categories) for t in transactions
+                ],
+                "next_offset": next_offset,
             }
         ), 200
 
+    except ApiError as e:
+        return jsonify({"message": e.message}), e.status_code, e.headers
+    except Exception as e:
+        return jsonify({"message": f"An error occurred: {str(e)}"}), 500
+
+
+@app.route("/api/transactions/export", methods=["GET"])
+@token_required
+def export_transactions(current_user):
+    try:
+        export_format = request.args.get("format", "csv")
+        if export_format not in export.FORMATS:
+            return jsonify({"message": "Format must be either csv or ndjson"}), 400
+
+        stmt = listing.filter_transactions(current_user.id, request.args)
+        filename = f"transactions_{datetime.now().strftime('%Y-%m-%d')}.{export_format}"
+
+        return Response(
+            stream_with_context(export.stream(stmt, export_format)),
+            mimetype=export.FORMATS[export_format],
+            headers={"Content-Disposition": f"attachment; filename={filename}"},
+        )
+
+    except ApiError as e:
+        return jsonify({"message": e.message}), e.status_code, e.headers
     except Exception as e:
         return jsonify({"message": f"An error occurred: {str(e)}"}), 500
 
@@ -200,33 +513,39 @@ def create_transaction(current_user):
         if data["type"] not in ["expense", "revenue"]:
             return jsonify({"message": "Type must be either expense or revenue"}), 400
 
-        transaction_date = datetime.strptime(data["date"], "%Y-%m-%d")
+        transaction_date = datetime.strptime(data["date"], "%Y-%m-%d").date()
+
+        category = get_category(data["category_id"])
+        if not category:
+            return jsonify({"message": "Category not found"}), 400
+
+        try:
+            amount_cents = to_minor(data["amount"])
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
 
         new_transaction = Transaction(
             user_id=current_user.id,
             date=transaction_date,
-            category_id=data["category_id"],
+            category_id=category["id"],
             description=data["description"],
-            amount=data["amount"],
+            amount_cents=amount_cents,
             type=data["type"],
+            change_seq=versions.bump(current_user.id),
         )
 
         db.session.add(new_transaction)
+        rollups.apply(rollups.snapshot(new_transaction))
+        threshold_status = thresholds.status(current_user, transaction_date)
         db.session.commit()
 
         return jsonify(
             {
                 "message": "Transaction created successfully",
-                "transaction": {
-                    "id": new_transaction.id,
-                    "date": new_transaction.date.strftime("%Y-%m-%d"),
-                    "category_id": new_transaction.category_id,
-                    "category_name": new_transaction.category.name,
-                    "category_icon": new_transaction.category.icon,
-                    "description": new_transaction.description,
-                    "amount": float(new_transaction.amount),
-                    "type": new_transaction.type,
-                },
+                "transaction": serialize_transaction(
+                    new_transaction, {category["id"]: category}
+                ),
+                "threshold_status": threshold_status,
             }
         ), 201
 
@@ -247,15 +566,22 @@ def update_transaction(current_user, transaction_id):
             return jsonify({"message": "Transaction not found"}), 404
 
         data = request.get_json()
+        previous = rollups.snapshot(transaction)
 
         if "date" in data:
-            transaction.date = datetime.strptime(data["date"], "%Y-%m-%d")
+            transaction.date = datetime.strptime(data["date"], "%Y-%m-%d").date()
         if "category_id" in data:
-            transaction.category_id = data["category_id"]
+            category = get_category(data["category_id"])
+            if not category:
+                return jsonify({"message": "Category not found"}), 400
+            transaction.category_id = category["id"]
         if "description" in data:
             transaction.description = data["description"]
         if "amount" in data:
-            transaction.amount = data["amount"]
+            try:
+                transaction.amount_cents = to_minor(data["amount"])
+            except ValueError as e:
+                return jsonify({"message": str(e)}), 400
         if "type" in data:
             if data["type"] not in ["expense", "revenue"]:
                 return jsonify(
@@ -263,21 +589,20 @@ def update_transaction(current_user, transaction_id):
                 ), 400
             transaction.type = data["type"]
 
+        transaction.change_seq = versions.bump(current_user.id)
+        rollups.apply(previous, sign=-1)
+        rollups.apply(rollups.snapshot(transaction))
+        threshold_status = thresholds.status(current_user, transaction.date)
         db.session.commit()
+        category = get_category(transaction.category_id)
 
         return jsonify(
             {
                 "message": "Transaction updated successfully",
-                "transaction": {
-                    "id": transaction.id,
-                    "date": transaction.date.strftime("%Y-%m-%d"),
-                    "category_id": transaction.category_id,
-                    "category_name": transaction.category.name,
-                    "category_icon": transaction.category.icon,
-                    "description": transaction.description,
-                    "amount": float(transaction.amount),
-                    "type": transaction.type,
-                },
+                "transaction": serialize_transaction(
+                    transaction, {transaction.category_id: category}
+                ),
+                "threshold_status": threshold_status,
             }
         ), 200
 
@@ -297,189 +622,262 @@ def delete_transaction(current_user, transaction_id):
         if not transaction:
             return jsonify({"message": "Transaction not found"}), 404
 
+        rollups.apply(rollups.snapshot(transaction), sign=-1)
+        threshold_status = thresholds.status(current_user, transaction.date)
+        changes.record_deletions(
+            current_user.id, [transaction.id], versions.bump(current_user.id)
+        )
         db.session.delete(transaction)
         db.session.commit()
 
-        return jsonify({"message": "Transaction deleted successfully"}), 200
+        return jsonify(
+            {
+                "message": "Transaction deleted successfully",
+                "threshold_status": threshold_status,
+            }
+        ), 200
 
     except Exception as e:
         db.session.rollback()
         return jsonify({"message": f"An error occurred: {str(e)}"}), 500
 
 
-# Analytics endpoints
-@app.route("/api/analytics/summary", methods=["GET"])
+# Bulk transaction endpoints; each request runs in a single DB transaction
+@app.route("/api/transactions/bulk", methods=["POST"])
 @token_required
-def get_summary(current_user):
+def bulk_create_transactions(current_user):
     try:
-        period = request.args.get("period")
-        month = request.args.get("month", type=int)
-        year = request.args.get("year", type=int, default=datetime.now().year)
+        # CSV bodies are parsed straight off the request stream; utf-8-sig
+        # drops the byte order mark Excel and bank exports start with
+        if request.mimetype == "text/csv":
+            reader = csv.DictReader(
+                io.TextIOWrapper(request.stream, encoding="utf-8-sig", newline="")
+            )
+            rows = ((reader.line_num, row) for row in reader)
+        else:
+            data = request.get_json()
+            if isinstance(data, dict):
+                data = data.get("transactions")
+            if not isinstance(data, list):
+                return jsonify({"message": "Expected a list of transactions"}), 400
+            rows = enumerate(data, start=1)
+
+        change_seq = versions.bump(current_user.id)
+        created, errors = bulk.insert_rows(current_user.id, rows, change_seq)
+        if errors and not created:
+            db.session.rollback()
+            return jsonify(
+                {"message": "No transactions were created", "errors": errors}
+            ), 400
 
-        query = Transaction.query.filter_by(user_id=current_user.id)
+        db.session.commit()
 
-        if period == "monthly" and month:
-            query = query.filter(
-                extract("month", Transaction.date) == month,
-                extract("year", Transaction.date) == year,
-            )
-        elif period == "yearly":
-            query = query.filter(extract("year", Transaction.date) == year)
+        return jsonify(
+            {
+                "message": f"{created} transactions created successfully",
+                "created": created,
+                "errors": errors,
+            }
+        ), 201
 
-        expenses = query.filter_by(type="expense").all()
-        revenues = query.filter_by(type="revenue").all()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"message": f"An error occurred: {str(e)}"}), 500
 
-        total_expenses = sum(t.amount for t in expenses)
-        total_revenues = sum(t.amount for t in revenues)
-        balance = total_revenues - total_expenses
+
+@app.route("/api/transactions/bulk", methods=["PUT"])
+@token_required
+def bulk_update_transactions(current_user):
+    try:
+        data = request.get_json()
+        if isinstance(data, dict):
+            data = data.get("transactions")
+        if not isinstance(data, list):
+            return jsonify({"message": "Expected a list of transactions"}), 400
+
+        change_seq = versions.bump(current_user.id)
+        updated, errors = bulk.update_rows(current_user.id, data, change_seq)
+        db.session.commit()
 
         return jsonify(
             {
-                "total_expenses": float(total_expenses),
-                "total_revenues": float(total_revenues),
-                "balance": float(balance),
+                "message": f"{updated} transactions updated successfully",
+                "updated": updated,
+                "errors": errors,
             }
         ), 200
 
     except Exception as e:
+        db.session.rollback()
         return jsonify({"message": f"An error occurred: {str(e)}"}), 500
 
 
-@app.route("/api/analytics/charts", methods=["GET"])
+@app.route("/api/transactions/bulk", methods=["DELETE"])
 @token_required
-def get_chart_data(current_user):
+def bulk_delete_transactions(current_user):
     try:
-        period = request.args.get("period", "monthly")
-        month = request.args.get("month", type=int)
-        year = request.args.get("year", type=int, default=datetime.now().year)
+        data = request.get_json()
+        ids = data.get("ids") if isinstance(data, dict) else data
+        if not isinstance(ids, list):
+            return jsonify({"message": "Expected a list of transaction ids"}), 400
 
-        # Expenses by category
-        query = Transaction.query.filter_by(user_id=current_user.id, type="expense")
+        change_seq = versions.bump(current_user.id)
+        deleted, errors = bulk.delete_rows(current_user.id, ids, change_seq)
+        db.session.commit()
 
-        if period == "monthly" and month:
-            query = query.filter(
-                extract("month", Transaction.date) == month,
-                extract("year", Transaction.date) == year,
-            )
-        elif period == "yearly":
-            query = query.filter(extract("year", Transaction.date) == year)
-
-        expenses_by_category = (
-            db.session.query(
-                Category.name,
-                Category.icon,
-                func.sum(Transaction.amount).label("total"),
-            )
-            .join(Transaction)
-            .filter(Transaction.id.in_([t.id for t in query.all()]))
-            .group_by(Category.id)
-            .all()
+        return jsonify(
+            {
+                "message": f"{deleted} transactions deleted successfully",
+                "deleted": deleted,
+                "errors": errors,
+            }
+        ), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"message": f"An error occurred: {str(e)}"}), 500
+
+
+# Analytics endpoints
+@app.route("/api/analytics/summary", methods=["GET"])
+@token_required
+@conditional
+def get_summary(current_user):
+    try:
+        period, month, year = period_args(request.args)
+
+        return jsonify(summarize(current_user.id, period, month, year)), 200
+
+    except ApiError as e:
+        return jsonify({"message": e.message}), e.status_code, e.headers
+    except Exception as e:
+        return jsonify({"message": f"An error occurred: {str(e)}"}), 500
+
+
+@app.route("/api/analytics/charts", methods=["GET"])
+@token_required
+@conditional
+def get_chart_data(current_user):
+    try:
+        period, month, year = period_args(request.args)
+        start, end, granularity, short_labels = chart_range(
+            period or "monthly",
+            month,
+            year,
+            request.args.get("start"),
+            request.args.get("end"),
+            request.args.get("granularity"),
+        )
+        _, chart_data = aggregate(
+            current_user.id, start, end, granularity, short_labels
         )
 
-        category_data = [
-            {"category": cat.name, "icon": cat.icon, "amount": float(cat.total)}
-            for cat in expenses_by_category
-        ]
+        return jsonify(chart_data), 200
 
-        # Timeline data
-        if period == "monthly" and month:
-            # Daily data for the month
-            timeline_query = (
-                db.session.query(
-                    extract("day", Transaction.date).label("day"),
-                    Transaction.type,
-                    func.sum(Transaction.amount).label("total"),
-                )
-                .filter(
-                    Transaction.user_id == current_user.id,
-                    extract("month", Transaction.date) == month,
-                    extract("year", Transaction.date) == year,
-                )
-                .group_by(extract("day", Transaction.date), Transaction.type)
-                .all()
-            )
+    except ApiError as e:
+        return jsonify({"message": e.message}), e.status_code, e.headers
+    except Exception as e:
+        return jsonify({"message": f"An error occurred: {str(e)}"}), 500
 
-            timeline_data = []
-            days_in_month = 31  # Simplified
-            for day in range(1, days_in_month + 1):
-                day_expenses = sum(
-                    t.total
-                    for t in timeline_query
-                    if t.day == day and t.type == "expense"
-                )
-                day_revenues = sum(
-                    t.total
-                    for t in timeline_query
-                    if t.day == day and t.type == "revenue"
-                )
-                timeline_data.append(
-                    {
-                        "period": str(day),
-                        "expenses": float(day_expenses),
-                        "revenues": float(day_revenues),
-                    }
-                )
-        else:
-            # Monthly data for the year
-            timeline_query = (
-                db.session.query(
-                    extract("month", Transaction.date).label("month"),
-                    Transaction.type,
-                    func.sum(Transaction.amount).label("total"),
-                )
-                .filter(
-                    Transaction.user_id == current_user.id,
-                    extract("year", Transaction.date) == year,
-                )
-                .group_by(extract("month", Transaction.date), Transaction.type)
-                .all()
-            )
 
-            month_names = [
-                "Jan",
-                "Feb",
-                "Mar",
-                "Apr",
-                "May",
-                "Jun",
-                "Jul",
-                "Aug",
-                "Sep",
-                "Oct",
-                "Nov",
-                "Dec",
-            ]
-            timeline_data = []
-            for month_num in range(1, 13):
-                month_expenses = sum(
-                    t.total
-                    for t in timeline_query
-                    if t.month == month_num and t.type == "expense"
-                )
-                month_revenues = sum(
-                    t.total
-                    for t in timeline_query
-                    if t.month == month_num and t.type == "revenue"
-                )
-                timeline_data.append(
-                    {
-                        "period": month_names[month_num - 1],
-                        "expenses": float(month_expenses),
-                        "revenues": float(month_revenues),
-                    }
-                )
+# Dashboard endpoint
+@app.route("/api/dashboard", methods=["GET"])
+@token_required
+@conditional
+def get_dashboard(current_user):
+    try:
+        period, month, year = period_args(request.args)
+
+        # Summary, charts and a page of recent transactions in one round trip;
+        # for calendar periods the summary falls out of the chart aggregation
+        start, end, granularity, short_labels = chart_range(
+            period or "monthly",
+            month,
+            year,
+            request.args.get("start"),
+            request.args.get("end"),
+            request.args.get("granularity"),
+        )
+        summary, chart_data = aggregate(
+            current_user.id, start, end, granularity, short_labels
+        )
+        explicit_range = request.args.get("start") or request.args.get("end")
+        if not explicit_range and period_range(period, month, year) is None:
+            # All-time summary; the charts still default to the current year
+            summary = summarize(current_user.id, period, month, year)
+
+        # The recent transactions cover the same dates as the summary and charts
+        args = request.args.copy()
+        args.setdefault("limit", str(DASHBOARD_PAGE_SIZE))
+        date_range = None
+        if explicit_range:
+            args.pop("period", None)
+            date_range = (start, end)
+        recent = list_transactions(current_user, args, date_range)
 
         return jsonify(
-            {"expenses_by_category": category_data, "timeline": timeline_data}
+            {
+                "summary": summary,
+                "transactions": recent["transactions"],
+                "next_cursor": recent["next_cursor"],
+                "charts": chart_data,
+            }
         ), 200
 
+    except ApiError as e:
+        return jsonify({"message": e.message}), e.status_code, e.headers
     except Exception as e:
         return jsonify({"message": f"An error occurred: {str(e)}"}), 500
 
 
+# Live updates (server-sent events). The response is generated after the
+# request's app context is gone, so an idle stream holds a server thread but
+# no database connection; asgi.py serves the same stream without the thread.
+@app.route("/api/stream", methods=["GET"])
+@token_required
+def stream_events(current_user):
+    wakeup = threading.Event()
+    try:
+        subscription = events.broker.subscribe(current_user.id, wakeup.set)
+    except ApiError as e:
+        return jsonify({"message": e.message}), e.status_code, e.headers
+
+    try:
+        # Read after subscribing, so a change committed in between is either in
+        # this version or delivered as an event
+        version = versions.current_version(current_user.id)
+    except Exception as e:
+        events.broker.unsubscribe(subscription)
+        return jsonify({"message": f"An error occurred: {str(e)}"}), 500
+
+    heartbeat = app.config["STREAM_HEARTBEAT_SECONDS"]
+
+    def generate():
+        yield f"retry: {events.RETRY_MS}\n\n".encode()
+        yield events.format_event("ready", {"version": version})
+        while True:
+            # The heartbeat keeps proxies from closing an idle stream and is
+            # how a disconnected client is noticed
+            if not wakeup.wait(heartbeat):
+                yield events.HEARTBEAT
+                continue
+            wakeup.clear()
+            for name, payload in events.broker.drain(subscription):
+                yield events.format_event(name, payload)
+
+    response = Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    response.call_on_close(lambda: events.broker.unsubscribe(subscription))
+    return response
+
+
 # Category endpoints
 @app.route("/api/categories", methods=["GET"])
 @token_required
+@conditional
 def get_categories(current_user):
     try:
         category_type = request.args.get("type")
@@ -518,7 +916,9 @@ def create_category(current_user):
         new_category = Category(name=data["name"], type=data["type"], icon=data["icon"])
 
         db.session.add(new_category)
+        versions.bump_all()
         db.session.commit()
+        invalidate_category_map()
 
         return jsonify(
             {
@@ -537,7 +937,142 @@ def create_category(current_user):
         return jsonify({"message": f"An error occurred: {str(e)}"}), 500
 
 
+# Report endpoints; reports are built in the background, see jobs.py
+@app.route("/api/reports", methods=["POST"])
+@token_required
+def create_report(current_user):
+    try:
+        data = request.get_json() or {}
+        job = jobs.enqueue(
+            current_user.id,
+            data.get("type"),
+            data.get("params", {}),
+            app.config["REPORT_MAX_PENDING"],
+        )
+        jobs.report_runner.start(app)
+
+        return jsonify(
+            {
+                "message": "Report queued",
+                "job": jobs.serialize_job(job, jobs.report_runner.retention),
+            }
+        ), 202
+
+    except ApiError as e:
+        db.session.rollback()
+        return jsonify({"message": e.message}), e.status_code, e.headers
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"message": f"An error occurred: {str(e)}"}), 500
+
+
+@app.route("/api/reports", methods=["GET"])
+@token_required
+def get_reports(current_user):
+    try:
+        # Polling also (re)starts the dispatcher, e.g. after a restart with
+        # jobs still queued
+        jobs.report_runner.start(app)
+        reports = (
+            ReportJob.query.filter_by(user_id=current_user.id)
+            .order_by(ReportJob.id.desc())
+            .all()
+        )
+
+        return jsonify(
+            {
+                "reports": [
+                    jobs.serialize_job(job, jobs.report_runner.retention)
+                    for job in reports
+                ]
+            }
+        ), 200
+
+    except Exception as e:
+        return jsonify({"message": f"An error occurred: {str(e)}"}), 500
+
+
+@app.route("/api/reports/<int:job_id>", methods=["GET"])
+@token_required
+def get_report(current_user, job_id):
+    try:
+        jobs.report_runner.start(app)
+        job = ReportJob.query.filter_by(id=job_id, user_id=current_user.id).first()
+        if not job:
+            return jsonify({"message": "Report not found"}), 404
+
+        return jsonify(
+            {"job": jobs.serialize_job(job, jobs.report_runner.retention)}
+        ), 200
+
+    except Exception as e:
+        return jsonify({"message": f"An error occurred: {str(e)}"}), 500
+
+
+@app.route("/api/reports/<int:job_id>/download", methods=["GET"])
+@token_required
+def download_report(current_user, job_id):
+    try:
+        job = ReportJob.query.filter_by(id=job_id, user_id=current_user.id).first()
+        if not job:
+            return jsonify({"message": "Report not found"}), 404
+        if job.status != "done":
+            return jsonify({"message": f"Report is {job.status}"}), 409
+
+        path = jobs.result_path(app.config["REPORTS_DIR"], job.id)
+        if not os.path.exists(path):
+            return jsonify({"message": "Report has expired"}), 410
+
+        return send_file(
+            path,
+            mimetype=job.mimetype,
+            as_attachment=True,
+            download_name=job.filename,
+        )
+
+    except Exception as e:
+        return jsonify({"message": f"An error occurred: {str(e)}"}), 500
+
+
+# Alert endpoints
+@app.route("/api/alerts/over-threshold", methods=["GET"])
+@token_required
+def get_users_over_threshold(current_user):
+    try:
+        # Lists other users' data, so it is limited to ADMIN_USERS
+        if current_user.username not in app.config["ADMIN_USERS"]:
+            return jsonify({"message": "Admin access required"}), 403
+
+        now = datetime.now()
+        year = request.args.get("year", type=int, default=now.year)
+        month = request.args.get("month", type=int, default=now.month)
+        if not 1 <= month <= 12:
+            return jsonify({"message": "Month must be between 1 and 12"}), 400
+
+        rows = db.session.execute(thresholds.over_threshold_statement(year, month))
+
+        return jsonify(
+            {
+                "year": year,
+                "month": month,
+                "users": [
+                    {
+                        "id": user_id,
+                        "username": username,
+                        "email": email,
+                        **thresholds.status_payload(spent_cents, threshold_cents),
+                    }
+                    for user_id, username, email, threshold_cents, spent_cents in rows
+                ],
+            }
+        ), 200
+
+    except Exception as e:
+        return jsonify({"message": f"An error occurred: {str(e)}"}), 500
+
+
 if __name__ == "__main__":
     with app.app_context():
         db.create_all()
+        search.ensure_index()
     app.run(debug=True, port=5000)
@@ -0,0 +1,313 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import events
+import jwt
+import listing
+import metrics
+import slow_queries
+import versions
+from a2wsgi import WSGIMiddleware
+from analytics import (
+    aggregate_rows,
+    aggregate_statement,
+    chart_buckets,
+    chart_range,
+    period_args,
+    summary_from_rows,
+    summary_statement,
+)
+from app import app as flask_app
+from auth_cache import snapshot_user, token_cache
+from categories import build_category_map, cached_category_map, store_category_map
+from compression import choose_encoding, compress
+from database import async_url, init_engine
+from errors import ApiError
+from json_provider import dumps
+from models import Category, User, db
+from ratelimit import admission, rate_limiter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Mount, Route
+from werkzeug.datastructures import MultiDict
+from werkzeug.http import parse_accept_header, parse_etags, quote_etag
+
+# ASGI entry point: the read-heavy GET endpoints are served natively on async
+# SQLAlchemy sessions, everything else falls through to the Flask app. Routes,
+# response bodies, ETags and error messages match the Flask versions.
+#
+#     uvicorn asgi:app --port 5000
+
+config = flask_app.config
+
+# Flask-SQLAlchemy resolves relative SQLite paths against the instance
+# folder, so take the URL from its engine rather than from the config
+with flask_app.app_context():
+    database_url = db.engine.url
+
+async_engine = create_async_engine(
+    async_url(database_url), **config["SQLALCHEMY_ENGINE_OPTIONS"]
+)
+init_engine(async_engine.sync_engine, config)
+# The SQL hooks app.py installs on the Flask engine, for this one too
+if config["METRICS_ENABLED"]:
+    metrics.init_engine(async_engine.sync_engine)
+if config["SLOW_QUERY_MS"] > 0:
+    slow_queries.init_app(flask_app, async_engine.sync_engine, config["SLOW_QUERY_MS"])
+Session = async_sessionmaker(async_engine, expire_on_commit=False)
+
+
+def json_response(payload, status_code=200, headers=None):
+    return Response(
+        dumps(payload),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
+
+
+def compressed_response(request, body, headers):
+    if config["COMPRESSION_ENABLED"]:
+        headers["Vary"] = "Accept-Encoding"
+        encoding = choose_encoding(
+            parse_accept_header(request.headers.get("Accept-Encoding"))
+        )
+        if encoding is not None and len(body) >= config["COMPRESSION_MIN_SIZE"]:
+            body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+    return Response(body, headers=headers, media_type="application/json")
+
+
+async def authenticate(request, session):
+    token = request.headers.get("Authorization")
+    if not token:
+        raise ApiError("Token is missing", 401)
+    if token.startswith("Bearer "):
+        token = token[7:]
+
+    current_user = token_cache.get(token)
+    if current_user is None:
+        try:
+            data = jwt.decode(token, config["SECRET_KEY"], algorithms=["HS256"])
+        except jwt.ExpiredSignatureError:
+            raise ApiError("Token has expired", 401)
+        except jwt.InvalidTokenError:
+            raise ApiError("Invalid token", 401)
+        user = await session.get(User, data["user_id"])
+        if not user:
+            raise ApiError("User not found", 401)
+        current_user = snapshot_user(user)
+        token_cache.put(token, current_user, data.get("exp"))
+    return current_user
+
+
+# Same process-wide map as categories.get_category_map, loaded asynchronously
+async def categories_for(session, category_ids):
+    categories = cached_category_map()
+    if categories is None or any(i not in categories for i in category_ids):
+        result = await session.execute(select(Category))
+        categories = store_category_map(build_category_map(result.scalars()))
+    return categories
+
+
+async def list_transactions(session, user, args):
+    stmt, limit, response_format = listing.page_statement(user.id, args)
+    transactions = (await session.execute(stmt)).all()
+    categories = await categories_for(session, {t.category_id for t in transactions})
+    return listing.page_response(transactions, limit, response_format, categories)
+
+
+async def get_summary(session, user, args):
+    stmt = summary_statement(user.id, *period_args(args))
+    return summary_from_rows((await session.execute(stmt)).all())
+
+
+async def get_chart_data(session, user, args):
+    period, month, year = period_args(args)
+    start, end, granularity, short_labels = chart_range(
+        period or "monthly",
+        month,
+        year,
+        args.get("start"),
+        args.get("end"),
+        args.get("granularity"),
+    )
+    buckets = chart_buckets(start, end, granularity)
+    rows = (await session.execute(aggregate_statement(user.id, start, end))).all()
+    categories = await categories_for(session, {row.category_id for row in rows})
+    _, chart_data = aggregate_rows(
+        rows, buckets, granularity, short_labels, lambda ids: categories
+    )
+    return chart_data
+
+
+async def get_categories(session, user, args):
+    stmt = select(Category)
+    if args.get("type"):
+        stmt = stmt.where(Category.type == args.get("type"))
+
+    result = await session.execute(stmt)
+    return {
+        "categories": [
+            {"id": c.id, "name": c.name, "type": c.type, "icon": c.icon}
+            for c in result.scalars()
+        ]
+    }
+
+
+# Admission control, authentication, rate limiting, conditional GET (see
+# app.conditional) and error handling shared by every native endpoint
+async def respond(request, handler):
+    async with Session() as session:
+        try:
+            with admission:
+                user = await authenticate(request, session)
+                rate_limiter.check(user.id, "reads")
+                args = MultiDict(request.query_params.multi_items())
+
+                version = await session.scalar(versions.version_statement(user.id))
+                tag = versions.make_etag(
+                    user.id, version, request.url.path, args.items(multi=True)
+                )
+                headers = {
+                    "ETag": quote_etag(tag, weak=True),
+                    "Cache-Control": "private, no-cache",
+                }
+                if_none_match = parse_etags(request.headers.get("If-None-Match"))
+                if if_none_match.contains_weak(tag):
+                    return Response(status_code=304, headers=headers)
+
+                payload = await handler(session, user, args)
+                return compressed_response(request, dumps(payload), headers)
+
+        except ApiError as e:
+            return json_response({"message": e.message}, e.status_code, e.headers)
+        except Exception as e:
+            return json_response({"message": f"An error occurred: {str(e)}"}, 500)
+
+
+# The route label set here is what SQL metrics and slow query logs report
+def read_route(path, handler):
+    async def endpoint(request):
+        metrics.route_label.set(path)
+        if not config["METRICS_ENABLED"]:
+            return await respond(request, handler)
+
+        started = time.perf_counter()
+        metrics.registry.request_started()
+        try:
+            response = await respond(request, handler)
+        finally:
+            metrics.registry.request_finished()
+        elapsed = time.perf_counter() - started
+        metrics.registry.observe_request(
+            path, request.method, str(response.status_code), elapsed
+        )
+        return response
+
+    return Route(path, endpoint, methods=["GET"])
+
+
+# Unsubscribes however the response ends, including a client that disconnects
+# before the first event
+class EventStreamResponse(StreamingResponse):
+    def __init__(self, content, subscription):
+        super().__init__(
+            content,
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+        self.subscription = subscription
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            events.broker.unsubscribe(self.subscription)
+
+
+# Live updates: an idle stream costs one suspended coroutine and no thread or
+# database connection, so thousands of open dashboards are cheap. Events are
+# published by the Flask handlers running in a2wsgi's threads and handed to
+# this event loop through call_soon_threadsafe.
+async def stream_events(request):
+    loop = asyncio.get_running_loop()
+    wakeup = asyncio.Event()
+
+    def notify():
+        try:
+            loop.call_soon_threadsafe(wakeup.set)
+        except RuntimeError:  # the loop closed during shutdown
+            pass
+
+    metrics.route_label.set("/api/stream")
+    async with Session() as session:
+        subscription = None
+        try:
+            user = await authenticate(request, session)
+            rate_limiter.check(user.id, "reads")
+            subscription = events.broker.subscribe(user.id, notify)
+            # Read after subscribing, so a change committed in between is
+            # either in this version or delivered as an event
+            version = await session.scalar(versions.version_statement(user.id))
+        except Exception as e:
+            if subscription is not None:
+                events.broker.unsubscribe(subscription)
+            if isinstance(e, ApiError):
+                return json_response({"message": e.message}, e.status_code, e.headers)
+            return json_response({"message": f"An error occurred: {str(e)}"}, 500)
+
+    async def generate():
+        heartbeat = config["STREAM_HEARTBEAT_SECONDS"]
+        yield f"retry: {events.RETRY_MS}\n\n".encode()
+        yield events.format_event("ready", {"version": version})
+        while True:
+            try:
+                await asyncio.wait_for(wakeup.wait(), heartbeat)
+            except asyncio.TimeoutError:
+                yield events.HEARTBEAT
+                continue
+            wakeup.clear()
+            for name, payload in events.broker.drain(subscription):
+                yield events.format_event(name, payload)
+
+    return EventStreamResponse(generate(), subscription)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    await async_engine.dispose()
+
+
+app = Starlette(
+    routes=[
+        read_route("/api/transactions", list_transactions),
+        read_route("/api/analytics/summary", get_summary),
+        read_route("/api/analytics/charts", get_chart_data),
+        read_route("/api/categories", get_categories),
+        Route("/api/stream", stream_events, methods=["GET"]),
+        Mount("/", app=WSGIMiddleware(flask_app)),
+    ],
+    middleware=[
+        Middleware(
+            CORSMiddleware,
+            allow_origins=["*"],
+            allow_methods=["*"],
+            allow_headers=["*"],
+            expose_headers=["ETag"],
+        )
+    ],
+    lifespan=lifespan,
+)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run("asgi:app", port=5000)
@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from models import User
+from sqlalchemy import event
+
+# The subset of User that request handlers need; handlers that require the
+# full ORM object can still load it by id
+UserSnapshot = namedtuple(
+    "UserSnapshot", ["id", "username", "email", "monthly_spending_threshold_cents"]
+)
+
+
+def snapshot_user(user):
+    return UserSnapshot(
+        id=user.id,
+        username=user.username,
+        email=user.email,
+        monthly_spending_threshold_cents=user.monthly_spending_threshold_cents,
+    )
+
+
+# Bounded LRU of verified token -> (user snapshot, expiry). Entries expire at
+# the earlier of the TTL and the token's own exp claim; the TTL also bounds
+# staleness across worker processes, which do not see each other's
+# invalidations.
+class TokenCache:
+    def __init__(self, maxsize=10000, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, token):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, token, user, token_exp=None):
+        if self.maxsize <= 0:
+            return
+        expires_at = time.time() + self.ttl
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)
+        with self._lock:
+            self._entries[token] = (user, expires_at)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            stale = [t for t, (user, _) in self._entries.items() if user.id == user_id]
+            for token in stale:
+                del self._entries[token]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+token_cache = TokenCache()
+
+
+# Any change to a user row (profile edit, password rehash, deletion) drops
+# their cached snapshots so the next request reloads them
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    token_cache.invalidate_user(target.id)
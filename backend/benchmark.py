@@ -0,0 +1,342 @@
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+
+# The benchmark rebuilds its database for every dataset size, so never point
+# it at the development database by accident
+os.environ.setdefault("DATABASE_URL", "sqlite:///benchmark.db")
+# Measure the endpoints themselves, not the per-user rate limits
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+
+from app import app  # noqa: E402
+from auth_cache import token_cache  # noqa: E402
+from categories import invalidate_category_map  # noqa: E402
+from models import db  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+DEFAULT_SIZES = [1000, 100000, 1000000]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the API endpoints at several dataset sizes."
+    )
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(size) for size in DEFAULT_SIZES),
+        help="comma-separated transactions per user, one dataset per size",
+    )
+    parser.add_argument("--users", type=int, default=2)
+    parser.add_argument("--requests", type=int, default=50, help="per scenario")
+    parser.add_argument("--login-requests", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="client threads for the mixed_concurrent scenario",
+    )
+    parser.add_argument(
+        "--write-share",
+        type=float,
+        default=0.2,
+        help="fraction of mixed_concurrent requests that create transactions",
+    )
+    parser.add_argument("--scenarios", help="comma-separated subset to run")
+    parser.add_argument(
+        "--skip-generate",
+        action="store_true",
+        help="benchmark the existing database once instead of generating sizes",
+    )
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument(
+        "--baseline", help="results file to compare against; fails on regression"
+    )
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.25,
+        help="allowed p95 slowdown vs the baseline (0.25 = 25%%)",
+    )
+    return parser.parse_args(argv)
+
+
+def scenarios(today):
+    month = f"period=monthly&month={today.month}&year={today.year}"
+    year = f"period=yearly&year={today.year}"
+    new_transaction = {
+        "date": today.isoformat(),
+        "category_id": 1,
+        "description": "Benchmark expense",
+        "amount": 12.34,
+        "type": "expense",
+    }
+    return {
+        "transactions_page": ("GET", "/api/transactions?limit=50", None),
+        "transactions_month": ("GET", f"/api/transactions?{month}", None),
+        "summary_year": ("GET", f"/api/analytics/summary?{year}", None),
+        "summary_month": ("GET", f"/api/analytics/summary?{month}", None),
+        "charts_year": ("GET", f"/api/analytics/charts?{year}", None),
+        "charts_month": ("GET", f"/api/analytics/charts?{month}", None),
+        "dashboard_month": ("GET", f"/api/dashboard?{month}", None),
+        "categories": ("GET", "/api/categories", None),
+        "create_transaction": ("POST", "/api/transactions", new_transaction),
+        "login": (
+            "POST",
+            "/api/login",
+            {"username": "demo", "password": "demo123"},
+        ),
+    }
+
+
+# Requests the mixed_concurrent scenario draws from: reads hit the listing
+# and analytics endpoints while writes create transactions, all at once
+MIXED_READS = ["transactions_page", "transactions_month", "dashboard_month"]
+MIXED_WRITE = "create_transaction"
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = int(round(fraction * (len(sorted_values) - 1)))
+    return sorted_values[min(len(sorted_values) - 1, index)]
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def generate(size, users):
+    print(f"Generating {users} users x {size} transactions...")
+    subprocess.run(
+        [
+            sys.executable,
+            "generate_data.py",
+            "--users",
+            str(users),
+            "--transactions",
+            str(size),
+            "--end",
+            date.today().isoformat(),
+        ],
+        check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.DEVNULL,
+    )
+
+
+def run_scenario(client, headers, method, url, body, count, warmup, statements):
+    for _ in range(warmup):
+        client.open(url, method=method, json=body, headers=headers)
+
+    latencies = []
+    statements[0] = 0
+    errors = 0
+    started = time.perf_counter()
+    for _ in range(count):
+        request_started = time.perf_counter()
+        response = client.open(url, method=method, json=body, headers=headers)
+        response.get_data()
+        latencies.append((time.perf_counter() - request_started) * 1000)
+        if response.status_code >= 400:
+            errors += 1
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": count,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "throughput_rps": round(count / elapsed, 1) if elapsed else 0.0,
+        "sql_statements_per_request": round(statements[0] / count, 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+# Every thread gets its own test client and issues count requests, a
+# write_share fraction of them writes; latencies are pooled across threads
+def run_concurrent(headers, requests, options, statements):
+    reads = [requests[name] for name in MIXED_READS]
+    write = requests[MIXED_WRITE]
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def worker(index):
+        client = app.test_client()
+        rng = random.Random(index)
+        local = []
+        failed = 0
+        for _ in range(options.requests):
+            if rng.random() < options.write_share:
+                method, url, body = write
+            else:
+                method, url, body = rng.choice(reads)
+            request_started = time.perf_counter()
+            response = client.open(url, method=method, json=body, headers=headers)
+            response.get_data()
+            local.append((time.perf_counter() - request_started) * 1000)
+            if response.status_code >= 400:
+                failed += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    statements[0] = 0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=options.concurrency) as executor:
+        list(executor.map(worker, range(options.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    count = len(latencies)
+    latencies.sort()
+    return {
+        "requests": count,
+        "errors": errors[0],
+        "concurrency": options.concurrency,
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "throughput_rps": round(count / elapsed, 1) if elapsed else 0.0,
+        "sql_statements_per_request": round(statements[0] / count, 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def run_size(options, selected):
+    # The dataset was just regenerated underneath the in-process caches
+    invalidate_category_map()
+    token_cache.clear()
+
+    client = app.test_client()
+    response = client.post(
+        "/api/login", json={"username": "demo", "password": "demo123"}
+    )
+    headers = {"Authorization": f"Bearer {response.get_json()['token']}"}
+
+    statements = [0]
+
+    def count_statement(*args):
+        statements[0] += 1
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", count_statement)
+
+    requests = scenarios(date.today())
+    names = list(requests) + ["mixed_concurrent"]
+    results = {}
+    try:
+        for name in names:
+            if selected and name not in selected:
+                continue
+            if name == "mixed_concurrent":
+                results[name] = run_concurrent(headers, requests, options, statements)
+            else:
+                method, url, body = requests[name]
+                count = (
+                    options.login_requests if name == "login" else options.requests
+                )
+                results[name] = run_scenario(
+                    client,
+                    {} if name == "login" else headers,
+                    method,
+                    url,
+                    body,
+                    count,
+                    options.warmup,
+                    statements,
+                )
+            print(
+                f"   {name:<20} p50 {results[name]['p50_ms']:>9.2f}ms  "
+                f"p95 {results[name]['p95_ms']:>9.2f}ms  "
+                f"p99 {results[name]['p99_ms']:>9.2f}ms  "
+                f"{results[name]['throughput_rps']:>8.1f} req/s  "
+                f"{results[name]['sql_statements_per_request']:>5} sql/req"
+            )
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Returns a line per (size, scenario) whose p95 got slower than allowed; a
+# 1ms floor keeps sub-millisecond noise from failing the run
+def find_regressions(results, baseline, max_regression):
+    regressions = []
+    for size, scenarios_results in results["sizes"].items():
+        for name, current in scenarios_results.items():
+            previous = baseline.get("sizes", {}).get(size, {}).get(name)
+            if not previous:
+                continue
+            limit = max(
+                previous["p95_ms"] * (1 + max_regression), previous["p95_ms"] + 1
+            )
+            if current["p95_ms"] > limit:
+                regressions.append(
+                    f"{size}/{name}: p95 {current['p95_ms']}ms "
+                    f"vs baseline {previous['p95_ms']}ms"
+                )
+    return regressions
+
+
+def main(options):
+    selected = set(options.scenarios.split(",")) if options.scenarios else None
+    sizes = ["existing"] if options.skip_generate else options.sizes.split(",")
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "database": app.config["SQLALCHEMY_DATABASE_URI"],
+        "journal_mode": app.config["SQLITE_JOURNAL_MODE"],
+        "users": options.users,
+        "sizes": {},
+    }
+    for size in sizes:
+        if not options.skip_generate:
+            generate(int(size), options.users)
+        print(f"Benchmarking dataset: {size} transactions per user")
+        results["sizes"][size] = run_size(options, selected)
+
+    with open(options.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"✅ Results written to {options.output}")
+
+    if options.baseline:
+        with open(options.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, options.max_regression)
+        for line in regressions:
+            print(f"   - {line}")
+        if regressions:
+            print(f"❌ {len(regressions)} scenarios regressed")
+            return 1
+        print("✅ No regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
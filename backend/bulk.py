@@ -0,0 +1,217 @@
+from datetime import datetime
+
+import changes
+import rollups
+from categories import get_category_map, invalidate_category_map
+from errors import ApiError
+from models import Transaction, db
+from money import to_minor
+from sqlalchemy import bindparam, select
+
+CHUNK_SIZE = 1000
+ID_CHUNK_SIZE = 500  # stays well under SQLite's bound-parameter limit
+
+FIELDS = ["date", "category_id", "description", "amount", "type"]
+COLUMNS = ["date", "category_id", "description", "amount_cents", "type"]
+
+transaction_table = Transaction.__table__
+
+
+def chunked(items, size):
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def load_categories():
+    invalidate_category_map()
+    return get_category_map()
+
+
+# Validates one incoming row against the preloaded category set and returns
+# the column values it sets; partial rows (updates) may omit fields
+def parse_row(data, categories, partial=False):
+    if not isinstance(data, dict):
+        raise ApiError("Row must be an object")
+
+    if not partial:
+        missing = [field for field in FIELDS if data.get(field) in (None, "")]
+        if missing:
+            raise ApiError(f"Missing fields: {', '.join(missing)}")
+
+    values = {}
+    if "date" in data:
+        try:
+            values["date"] = datetime.strptime(data["date"], "%Y-%m-%d").date()
+        except (TypeError, ValueError):
+            raise ApiError("Date must be in YYYY-MM-DD format")
+    if "category_id" in data:
+        try:
+            values["category_id"] = int(data["category_id"])
+        except (TypeError, ValueError):
+            raise ApiError("Category not found")
+        if values["category_id"] not in categories:
+            raise ApiError("Category not found")
+    if "description" in data:
+        values["description"] = str(data["description"])[:200]
+    if "amount" in data:
+        try:
+            values["amount_cents"] = to_minor(data["amount"])
+        except ValueError:
+            raise ApiError("Amount must be a number")
+    if "type" in data:
+        if data["type"] not in ["expense", "revenue"]:
+            raise ApiError("Type must be either expense or revenue")
+        values["type"] = data["type"]
+    return values
+
+
+def rollup_entry(user_id, values):
+    return (
+        user_id,
+        values["date"],
+        values["category_id"],
+        values["type"],
+        values["amount_cents"],
+    )
+
+
+def load_owned(user_id, ids):
+    rows = {}
+    for chunk in chunked(sorted(set(ids)), ID_CHUNK_SIZE):
+        query = select(transaction_table).where(
+            transaction_table.c.user_id == user_id,
+            transaction_table.c.id.in_(chunk),
+        )
+        for row in db.session.execute(query).mappings():
+            rows[row["id"]] = {column: row[column] for column in COLUMNS}
+    return rows
+
+
+# Every bulk endpoint reports a bad item by its 1-based position in the request
+# and, once known, the transaction id it refers to
+def row_error(number, transaction_id, message):
+    return {"row": number, "id": transaction_id, "message": message}
+
+
+def parse_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ApiError("Transaction id must be an integer")
+
+
+# rows is an iterable of (row_number, data) so CSV input can be streamed;
+# valid rows are inserted in executemany batches, invalid ones reported.
+# change_seq is the version from versions.bump, see changes.py.
+def insert_rows(user_id, rows, change_seq):
+    categories = load_categories()
+    errors = []
+    deltas = {}
+    batch = []
+    created = 0
+
+    for number, data in rows:
+        try:
+            values = parse_row(data, categories)
+        except ApiError as e:
+            errors.append(row_error(number, None, e.message))
+            continue
+
+        values["user_id"] = user_id
+        values["change_seq"] = change_seq
+        batch.append(values)
+        rollups.collect([rollup_entry(user_id, values)], deltas=deltas)
+
+        if len(batch) >= CHUNK_SIZE:
+            db.session.execute(transaction_table.insert(), batch)
+            created += len(batch)
+            batch = []
+
+    if batch:
+        db.session.execute(transaction_table.insert(), batch)
+        created += len(batch)
+
+    rollups.apply_deltas(deltas)
+    return created, errors
+
+
+def update_rows(user_id, items, change_seq):
+    categories = load_categories()
+    errors = []
+    deltas = {}
+    updates = {}
+
+    ids = []
+    for item in items:
+        try:
+            ids.append(parse_id(item.get("id") if isinstance(item, dict) else None))
+        except ApiError:
+            pass
+    existing = load_owned(user_id, ids)
+
+    for number, item in enumerate(items, start=1):
+        transaction_id = None
+        try:
+            transaction_id = parse_id(
+                item.get("id") if isinstance(item, dict) else None
+            )
+            if transaction_id not in existing:
+                raise ApiError("Transaction not found")
+            values = parse_row(item, categories, partial=True)
+        except ApiError as e:
+            errors.append(row_error(number, transaction_id, e.message))
+            continue
+
+        previous = existing[transaction_id]
+        current = {**previous, **values}
+        rollups.collect([rollup_entry(user_id, previous)], -1, deltas)
+        rollups.collect([rollup_entry(user_id, current)], deltas=deltas)
+        existing[transaction_id] = current
+        updates[transaction_id] = {"_id": transaction_id, **current}
+
+    stmt = (
+        transaction_table.update()
+        .where(transaction_table.c.id == bindparam("_id"))
+        .values(
+            {
+                **{column: bindparam(column) for column in COLUMNS},
+                "change_seq": change_seq,
+            }
+        )
+    )
+    for chunk in chunked(list(updates.values()), CHUNK_SIZE):
+        db.session.execute(stmt, chunk)
+
+    rollups.apply_deltas(deltas)
+    return len(updates), errors
+
+
+def delete_rows(user_id, ids, change_seq):
+    errors = []
+    numbers = {}  # transaction id -> row it first appears on
+    for number, value in enumerate(ids, start=1):
+        try:
+            numbers.setdefault(parse_id(value), number)
+        except ApiError as e:
+            errors.append(row_error(number, None, e.message))
+
+    existing = load_owned(user_id, list(numbers))
+    for transaction_id, number in numbers.items():
+        if transaction_id not in existing:
+            errors.append(row_error(number, transaction_id, "Transaction not found"))
+    errors.sort(key=lambda error: error["row"])
+
+    deltas = rollups.collect(
+        [rollup_entry(user_id, values) for values in existing.values()], -1
+    )
+    for chunk in chunked(list(existing), ID_CHUNK_SIZE):
+        db.session.execute(
+            transaction_table.delete().where(
+                transaction_table.c.user_id == user_id,
+                transaction_table.c.id.in_(chunk),
+            )
+        )
+
+    changes.record_deletions(user_id, list(existing), change_seq)
+    rollups.apply_deltas(deltas)
+    return len(existing), errors
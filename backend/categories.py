@@ -0,0 +1,71 @@
+import threading
+
+from models import Category
+
+# Process-level id -> category snapshot used when serializing transactions.
+# Categories are only ever added, so a miss simply triggers a reload; this
+# also picks up categories created by other worker processes.
+_lock = threading.Lock()
+_category_map = None
+
+
+def build_category_map(categories):
+    return {
+        c.id: {"id": c.id, "name": c.name, "type": c.type, "icon": c.icon}
+        for c in categories
+    }
+
+
+def _load():
+    return build_category_map(Category.query.all())
+
+
+def get_category_map():
+    global _category_map
+    if _category_map is None:
+        with _lock:
+            if _category_map is None:
+                _category_map = _load()
+    return _category_map
+
+
+# Returns a map covering every id in category_ids, reloading once on a miss
+def categories_for(category_ids):
+    categories = get_category_map()
+    if any(category_id not in categories for category_id in category_ids):
+        invalidate_category_map()
+        categories = get_category_map()
+    return categories
+
+
+# For callers that load categories themselves (the async server): the
+# current map without loading it, or None, and a way to install a fresh one
+def cached_category_map():
+    return _category_map
+
+
+def store_category_map(category_map):
+    global _category_map
+    with _lock:
+        _category_map = category_map
+    return category_map
+
+
+# Accepts the id as clients send it (forms post "1"); anything that is not an
+# integer is simply not found, without reloading the map
+def get_category(category_id):
+    try:
+        category_id = int(category_id)
+    except (TypeError, ValueError):
+        return None
+    category = get_category_map().get(category_id)
+    if category is None:
+        invalidate_category_map()
+        category = get_category_map().get(category_id)
+    return category
+
+
+def invalidate_category_map():
+    global _category_map
+    with _lock:
+        _category_map = None
@@ -0,0 +1,149 @@
+import sys
+from datetime import datetime, timedelta
+
+from categories import categories_for
+from errors import ApiError
+from listing import COLUMNS
+from models import Transaction, TransactionTombstone, User, db
+from serializers import serialize_transaction
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+# More changes than this since a cursor and the client is told to reload
+MAX_CHANGES = 1000
+
+tombstone_table = TransactionTombstone.__table__
+user_table = User.__table__
+
+# How long tombstones are kept; set from TOMBSTONE_RETENTION_DAYS in app.py
+retention = timedelta(days=30)
+
+
+# Every transaction write stamps the row with the user's new data version
+# (versions.bump), and every delete leaves a tombstone stamped the same way,
+# so "everything after version N" is one indexed range scan per table.
+def record_deletions(user_id, transaction_ids, change_seq):
+    if not transaction_ids:
+        return
+
+    dialect = db.session.get_bind().dialect.name
+    upsert = (postgresql if dialect == "postgresql" else sqlite).insert
+
+    # SQLite may hand a deleted id out again, so a later delete of the new
+    # row overwrites the user's old tombstone
+    stmt = upsert(tombstone_table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "id"],
+        set_={
+            "change_seq": stmt.excluded.change_seq,
+            "deleted_at": stmt.excluded.deleted_at,
+        },
+    )
+    now = datetime.utcnow()
+    db.session.execute(
+        stmt,
+        [
+            {
+                "id": transaction_id,
+                "user_id": user_id,
+                "change_seq": change_seq,
+                "deleted_at": now,
+            }
+            for transaction_id in transaction_ids
+        ],
+    )
+    prune(user_id)
+
+
+# Deletes tombstones older than the retention period, for one user or all of
+# them, and raises each affected user's changes_horizon to the newest pruned
+# change_seq: a cursor below the horizon may have missed a pruned delete, so
+# it gets a reset. Returns the number of tombstones deleted.
+def prune(user_id=None):
+    stmt = tombstone_table.delete().where(
+        tombstone_table.c.deleted_at < datetime.utcnow() - retention
+    )
+    if user_id is not None:
+        stmt = stmt.where(tombstone_table.c.user_id == user_id)
+    pruned = db.session.execute(
+        stmt.returning(tombstone_table.c.user_id, tombstone_table.c.change_seq)
+    ).all()
+
+    horizons = {}
+    for pruned_user_id, change_seq in pruned:
+        horizons[pruned_user_id] = max(horizons.get(pruned_user_id, 0), change_seq)
+    for pruned_user_id, horizon in horizons.items():
+        db.session.execute(
+            update(user_table)
+            .where(
+                user_table.c.id == pruned_user_id,
+                user_table.c.changes_horizon < horizon,
+            )
+            .values(changes_horizon=horizon)
+        )
+    return len(pruned)
+
+
+def reset_payload(cursor):
+    return {"reset": True, "cursor": cursor, "transactions": [], "deleted": []}
+
+
+# Changes after the `since` cursor. The version is read before the rows, so a
+# change committed in between is sent again next time rather than skipped.
+# Clients apply `deleted` before `transactions`; with no cursor, a cursor from
+# another database, one older than the pruned tombstones or too many changes
+# the response asks for a full reload (reset) and carries the cursor to
+# continue from afterwards.
+def changes_payload(user_id, since):
+    cursor, horizon = db.session.execute(
+        select(user_table.c.data_version, user_table.c.changes_horizon).where(
+            user_table.c.id == user_id
+        )
+    ).one()
+    if since is None:
+        return reset_payload(cursor)
+    try:
+        since = int(since)
+    except ValueError:
+        raise ApiError("Since must be an integer")
+    if since < 0:
+        raise ApiError("Since must not be negative")
+    if since > cursor or since < horizon:
+        return reset_payload(cursor)
+
+    transactions = db.session.execute(
+        select(*COLUMNS)
+        .where(Transaction.user_id == user_id, Transaction.change_seq > since)
+        .order_by(Transaction.change_seq, Transaction.id)
+        .limit(MAX_CHANGES + 1)
+    ).all()
+    deleted = db.session.scalars(
+        select(TransactionTombstone.id)
+        .where(
+            TransactionTombstone.user_id == user_id,
+            TransactionTombstone.change_seq > since,
+        )
+        .order_by(TransactionTombstone.change_seq, TransactionTombstone.id)
+        .limit(MAX_CHANGES + 1)
+    ).all()
+    if len(transactions) + len(deleted) > MAX_CHANGES:
+        return reset_payload(cursor)
+
+    categories = categories_for({t.category_id for t in transactions})
+    return {
+        "reset": False,
+        "cursor": cursor,
+        "transactions": [serialize_transaction(t, categories) for t in transactions],
+        "deleted": deleted,
+    }
+
+
+if __name__ == "__main__":
+    from app import app
+
+    if sys.argv[1:] != ["prune"]:
+        sys.exit("Usage: python changes.py prune")
+    with app.app_context():
+        count = prune()
+        db.session.commit()
+    print(f"✅ Pruned {count} transaction tombstones")
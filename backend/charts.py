@@ -0,0 +1,59 @@
+from datetime import date, timedelta
+
+GRANULARITIES = ("day", "week", "month")
+MAX_BUCKETS = 2000
+
+MONTH_NAMES = [
+    "Jan",
+    "Feb",
+    "Mar",
+    "Apr",
+    "May",
+    "Jun",
+    "Jul",
+    "Aug",
+    "Sep",
+    "Oct",
+    "Nov",
+    "Dec",
+]
+
+
+# Weeks start on Monday, months on the 1st
+def bucket_start(day, granularity):
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(start, granularity):
+    if granularity == "week":
+        return start + timedelta(days=7)
+    if granularity == "month":
+        if start.month == 12:
+            return date(start.year + 1, 1, 1)
+        return date(start.year, start.month + 1, 1)
+    return start + timedelta(days=1)
+
+
+# Every bucket overlapping [start, end), so empty periods still get a point
+def bucket_starts(start, end, granularity):
+    buckets = []
+    current = bucket_start(start, granularity)
+    while current < end:
+        buckets.append(current)
+        if len(buckets) > MAX_BUCKETS:
+            raise ValueError(f"Range spans more than {MAX_BUCKETS} buckets")
+        current = next_bucket(current, granularity)
+    return buckets
+
+
+# Calendar-period views keep their short labels ("1".."31", "Jan".."Dec")
+def bucket_label(start, granularity, short=False):
+    if granularity == "month":
+        return MONTH_NAMES[start.month - 1] if short else start.strftime("%Y-%m")
+    if granularity == "day" and short:
+        return str(start.day)
+    return start.isoformat()
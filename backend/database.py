@@ -0,0 +1,68 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SYNCHRONOUS_LEVELS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def is_sqlite(url):
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+# The same database behind an asyncio driver, for asgi.py
+def async_url(url):
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+# Engine keyword arguments for SQLALCHEMY_ENGINE_OPTIONS. SQLite keeps
+# SQLAlchemy's default pool (one connection per thread is cheap) and only gets
+# a lock timeout; server databases get a sized, pre-pinged pool.
+def engine_options(config):
+    if is_sqlite(config["SQLALCHEMY_DATABASE_URI"]):
+        return {
+            "connect_args": {"timeout": config["SQLITE_BUSY_TIMEOUT_MS"] / 1000}
+        }
+    return {
+        "pool_size": config["DB_POOL_SIZE"],
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_pre_ping": config["DB_POOL_PRE_PING"],
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+    }
+
+
+def sqlite_pragmas(config):
+    journal_mode = config["SQLITE_JOURNAL_MODE"].upper()
+    synchronous = config["SQLITE_SYNCHRONOUS"].upper()
+    if journal_mode not in JOURNAL_MODES:
+        raise ValueError(f"Unsupported SQLITE_JOURNAL_MODE: {journal_mode}")
+    if synchronous not in SYNCHRONOUS_LEVELS:
+        raise ValueError(f"Unsupported SQLITE_SYNCHRONOUS: {synchronous}")
+    return [
+        f"PRAGMA journal_mode={journal_mode}",
+        f"PRAGMA synchronous={synchronous}",
+        f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}",
+        f"PRAGMA cache_size={int(config['SQLITE_CACHE_SIZE'])}",
+    ]
+
+
+# PRAGMAs are per connection (journal_mode=WAL also persists in the file), so
+# they are applied to every new DBAPI connection the pool opens
+def init_engine(engine, config):
+    if engine.dialect.name != "sqlite":
+        return
+    pragmas = sqlite_pragmas(config)
+
+    @event.listens_for(engine, "connect")
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
@@ -0,0 +1,8 @@
+# Raised by request helpers for client errors and load shedding; handlers turn
+# it into the usual {"message": ...} response with the given status code
+class ApiError(Exception):
+    def __init__(self, message, status_code=400, headers=None):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+        self.headers = headers or {}
@@ -0,0 +1,148 @@
+import threading
+from collections import deque
+
+from errors import ApiError
+from json_provider import dumps
+from models import db
+from money import to_major
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Sent first on every stream: how long the browser waits before reconnecting
+RETRY_MS = 5000
+HEARTBEAT = b": ping\n\n"
+
+
+def format_event(name, payload):
+    return b"event: " + name.encode() + b"\ndata: " + dumps(payload) + b"\n\n"
+
+
+class Subscription:
+    def __init__(self, user_id, notify):
+        self.user_id = user_id
+        self.notify = notify
+        self.messages = deque()
+        self.overflowed = False
+
+
+# In-process pub/sub for the /api/stream endpoints. Publishing never blocks:
+# each subscription buffers at most max_pending messages, and one that falls
+# further behind (a slow or stalled client) has its backlog dropped and gets a
+# single "resync" event instead, telling it to reload. notify is called from
+# the publishing thread and must only wake the consumer up (set an Event).
+# Each worker process has its own broker and only sees its own writes.
+class Broker:
+    def __init__(self, max_pending=64, max_subscribers=10000):
+        self.max_pending = max_pending
+        self.max_subscribers = max_subscribers
+        self._subscribers = {}
+        self._count = 0
+        self._lock = threading.Lock()
+        self.published = 0
+        self.resyncs = 0
+
+    def subscribe(self, user_id, notify):
+        with self._lock:
+            if self._count >= self.max_subscribers:
+                raise ApiError(
+                    "Too many open streams, please try again later",
+                    503,
+                    headers={"Retry-After": str(RETRY_MS // 1000)},
+                )
+            subscription = Subscription(user_id, notify)
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+            self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscribers.get(subscription.user_id)
+            if subscriptions is None or subscription not in subscriptions:
+                return
+            subscriptions.remove(subscription)
+            if not subscriptions:
+                del self._subscribers[subscription.user_id]
+            self._count -= 1
+
+    def publish(self, user_id, name, payload):
+        with self._lock:
+            subscriptions = list(self._subscribers.get(user_id, ()))
+            for subscription in subscriptions:
+                if subscription.overflowed:
+                    continue
+                if len(subscription.messages) >= self.max_pending:
+                    subscription.messages.clear()
+                    subscription.overflowed = True
+                    self.resyncs += 1
+                else:
+                    subscription.messages.append((name, payload))
+            self.published += 1
+        for subscription in subscriptions:
+            subscription.notify()
+
+    # Takes everything queued for the subscription as (name, payload) pairs
+    def drain(self, subscription):
+        with self._lock:
+            if subscription.overflowed:
+                subscription.overflowed = False
+                return [("resync", {})]
+            messages = list(subscription.messages)
+            subscription.messages.clear()
+        return messages
+
+    def stats(self):
+        with self._lock:
+            return {
+                "connections": self._count,
+                "published": self.published,
+                "resyncs": self.resyncs,
+            }
+
+
+broker = Broker()
+
+
+# rollups.apply_deltas stages every change it writes here, per month, category
+# and type; the summary deltas are only published once the DB transaction
+# commits, and dropped if it rolls back
+def stage(deltas):
+    staged = db.session.info.setdefault("summary_deltas", {})
+    for (user_id, day, category_id, transaction_type), (cents, count) in deltas.items():
+        key = (user_id, day.year, day.month, category_id, transaction_type)
+        total, number = staged.get(key, (0, 0))
+        staged[key] = (total + cents, number + count)
+
+
+def summary_events(staged, data_versions):
+    changes = {}
+    for key, (cents, count) in staged.items():
+        if not cents and not count:
+            continue
+        user_id, year, month, category_id, transaction_type = key
+        changes.setdefault(user_id, []).append(
+            {
+                "year": year,
+                "month": month,
+                "category_id": category_id,
+                "type": transaction_type,
+                "amount": to_major(cents),
+                "count": count,
+            }
+        )
+    for user_id, user_changes in changes.items():
+        yield user_id, {"version": data_versions.get(user_id), "changes": user_changes}
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_staged(session):
+    staged = session.info.pop("summary_deltas", None)
+    data_versions = session.info.pop("data_versions", {})
+    if staged:
+        for user_id, payload in summary_events(staged, data_versions):
+            broker.publish(user_id, "summary", payload)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_staged(session, previous_transaction):
+    session.info.pop("summary_deltas", None)
+    session.info.pop("data_versions", None)
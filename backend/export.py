@@ -0,0 +1,49 @@
+import csv
+import io
+
+from categories import get_category
+from json_provider import dumps
+from models import db
+from money import format_minor
+from serializers import serialize_transaction
+
+CHUNK_SIZE = 1000
+
+FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+CSV_HEADERS = ["Date", "Category", "Description", "Amount", "Type"]
+
+
+# Streams the filtered transactions in CHUNK_SIZE batches from a server-side
+# cursor, so memory stays flat however long the history is
+def stream(stmt, export_format):
+    rows = db.session.execute(stmt.execution_options(yield_per=CHUNK_SIZE))
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if export_format == "csv":
+        writer.writerow(CSV_HEADERS)
+
+    for count, row in enumerate(rows, start=1):
+        category = get_category(row.category_id)
+        if export_format == "csv":
+            writer.writerow(
+                [
+                    row.date.strftime("%Y-%m-%d"),
+                    category["name"],
+                    row.description,
+                    format_minor(row.amount_cents),
+                    row.type,
+                ]
+            )
+        else:
+            # Same encoder as the JSON responses, so rows match the listing
+            payload = serialize_transaction(row, {row.category_id: category})
+            buffer.write(dumps(payload).decode() + "\n")
+
+        if count % CHUNK_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
@@ -0,0 +1,218 @@
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+
+import rollups
+import search
+from app import app
+from models import Transaction, User, db
+from money import SCALE
+from seed_data import (
+    EXPENSE_AMOUNTS,
+    EXPENSE_DESCRIPTIONS,
+    REVENUE_AMOUNTS,
+    REVENUE_DESCRIPTIONS,
+    create_categories,
+)
+from werkzeug.security import generate_password_hash
+
+BATCH_SIZE = 50000
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate a large, reproducible synthetic dataset."
+    )
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument(
+        "--transactions", type=int, default=10000, help="transactions per user"
+    )
+    parser.add_argument("--days", type=int, default=730, help="date span in days")
+    parser.add_argument(
+        "--end",
+        type=lambda value: datetime.strptime(value, "%Y-%m-%d").date(),
+        default=date.today(),
+        help="last date of the span (YYYY-MM-DD), defaults to today",
+    )
+    parser.add_argument(
+        "--skew",
+        type=float,
+        default=1.0,
+        help="Zipf exponent for category popularity (0 = uniform)",
+    )
+    parser.add_argument(
+        "--revenue-share",
+        type=float,
+        default=0.15,
+        help="fraction of transactions that are revenues",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args(argv)
+
+
+# Cumulative Zipf weights: the i-th category is 1 / (i + 1) ** skew as
+# likely as the first
+def zipf_weights(count, skew):
+    weights = []
+    total = 0.0
+    for i in range(count):
+        total += 1.0 / (i + 1) ** skew
+        weights.append(total)
+    return weights
+
+
+# Yields row tuples (in COLUMNS order) for one user; all randomness comes
+# from rng, so the same seed and arguments always produce the same rows
+def generate_user_rows(rng, user_id, options, expense_categories, revenue_categories):
+    dates = [
+        (options.end - timedelta(days=offset)).isoformat()
+        for offset in range(options.days)
+    ]
+    created_at = f"{options.end.isoformat()} 00:00:00.000000"
+    expense_weights = zipf_weights(len(expense_categories), options.skew)
+    revenue_weights = zipf_weights(len(revenue_categories), options.skew)
+
+    revenue_count = round(options.transactions * options.revenue_share)
+    kinds = [
+        (
+            "expense",
+            expense_categories,
+            expense_weights,
+            EXPENSE_DESCRIPTIONS,
+            EXPENSE_AMOUNTS,
+            options.transactions - revenue_count,
+        ),
+        (
+            "revenue",
+            revenue_categories,
+            revenue_weights,
+            REVENUE_DESCRIPTIONS,
+            REVENUE_AMOUNTS,
+            revenue_count,
+        ),
+    ]
+
+    for kind, categories, weights, descriptions, amounts, count in kinds:
+        picked = rng.choices(categories, cum_weights=weights, k=count)
+        picked_dates = rng.choices(dates, k=count)
+        for category, transaction_date in zip(picked, picked_dates):
+            low, high = amounts[category.name]
+            yield (
+                user_id,
+                transaction_date,
+                category.id,
+                rng.choice(descriptions[category.name]),
+                round(rng.uniform(low, high) * SCALE),
+                kind,
+                created_at,
+            )
+
+
+COLUMNS = [
+    "user_id",
+    "date",
+    "category_id",
+    "description",
+    "amount_cents",
+    "type",
+    "created_at",
+]
+
+
+# Rows go straight to the DBAPI executemany; skipping SQLAlchemy's per-row
+# parameter processing is what makes million-row runs fast
+def insert_batches(rows):
+    connection = db.session.connection()
+    placeholder = "?" if connection.dialect.paramstyle == "qmark" else "%s"
+    statement = (
+        f"INSERT INTO {Transaction.__tablename__} ({', '.join(COLUMNS)}) "
+        f"VALUES ({', '.join([placeholder] * len(COLUMNS))})"
+    )
+
+    batch = []
+    inserted = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            connection.exec_driver_sql(statement, batch)
+            inserted += len(batch)
+            batch = []
+    if batch:
+        connection.exec_driver_sql(statement, batch)
+        inserted += len(batch)
+    return inserted
+
+
+def generate_database(options):
+    rng = random.Random(options.seed)
+    started = time.perf_counter()
+
+    with app.app_context():
+        # Drop all tables and recreate
+        db.drop_all()
+        db.create_all()
+
+        print("Creating categories...")
+        expense_categories, revenue_categories = create_categories()
+
+        print(f"Creating {options.users} users...")
+        # Every generated user shares the demo password; hashing it once keeps
+        # user creation cheap
+        password_hash = generate_password_hash("demo123")
+        db.session.execute(
+            User.__table__.insert(),
+            [
+                {
+                    "username": "demo" if n == 0 else f"user{n}",
+                    "email": f"user{n}@antigravity.com",
+                    "password_hash": password_hash,
+                }
+                for n in range(options.users)
+            ],
+        )
+        user_ids = [
+            user_id for (user_id,) in db.session.query(User.id).order_by(User.id)
+        ]
+
+        print(f"Creating {options.transactions} transactions per user...")
+        # Loading into an unindexed table and indexing once at the end is far
+        # cheaper than maintaining every index row by row
+        indexes = Transaction.__table__.indexes
+        for index in indexes:
+            index.drop(bind=db.session.connection())
+
+        inserted = 0
+        for user_id in user_ids:
+            inserted += insert_batches(
+                generate_user_rows(
+                    rng, user_id, options, expense_categories, revenue_categories
+                )
+            )
+
+        print("Indexing transactions...")
+        for index in indexes:
+            index.create(bind=db.session.connection())
+        db.session.commit()
+
+        print("Building transaction rollups...")
+        rollups.rebuild()
+
+        if search.is_supported():
+            print("Building the search index...")
+            search.create_index()
+
+    elapsed = time.perf_counter() - started
+    print("✅ Synthetic dataset generated successfully!")
+    print(f"   - Created {len(user_ids)} users (demo / demo123, user<N> / demo123)")
+    print(f"   - Created {inserted} transactions in {elapsed:.1f}s")
+    print(
+        "   - Reproduce with: python generate_data.py "
+        f"--users {options.users} --transactions {options.transactions} "
+        f"--days {options.days} --end {options.end} --skew {options.skew} "
+        f"--revenue-share {options.revenue_share} --seed {options.seed}"
+    )
+
+
+if __name__ == "__main__":
+    generate_database(parse_args())
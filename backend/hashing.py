@@ -0,0 +1,86 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from errors import ApiError
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+# Password hashing is a deliberately slow KDF, so it runs in a small process
+# pool instead of on the request thread. At most max_pending calls may be
+# queued or running; beyond that requests are shed immediately with a 503
+# rather than piling up behind each other. Workers are spawned rather than
+# forked, like the report workers, so they do not inherit the server's threads
+# and locks; a pool broken by a dead worker is replaced and the call retried.
+class PasswordHasher:
+    def __init__(self, workers=2, max_pending=8, iterations=600000):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.iterations = iterations
+        self.rejected = 0
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+
+    @property
+    def method(self):
+        return f"pbkdf2:sha256:{self.iterations}"
+
+    def _submit(self, fn, *args):
+        # workers=0 hashes inline, e.g. for scripts and tests
+        if self.workers <= 0:
+            return fn(*args)
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._new_executor()
+                self._slots = threading.BoundedSemaphore(self.max_pending)
+            executor = self._executor
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise ApiError(
+                "Server is busy, please try again shortly",
+                503,
+                headers={"Retry-After": "1"},
+            )
+        try:
+            try:
+                return self._run(executor, fn, *args)
+            except BrokenProcessPool:
+                return self._run(self._replace_executor(executor), fn, *args)
+        finally:
+            self._slots.release()
+
+    def _new_executor(self):
+        return ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def _run(self, executor, fn, *args):
+        return executor.submit(fn, *args).result()
+
+    # Swaps in a fresh pool for a broken one, once however many calls notice
+    def _replace_executor(self, broken):
+        with self._lock:
+            if self._executor is broken:
+                self._executor = self._new_executor()
+            executor = self._executor
+        broken.shutdown(wait=False, cancel_futures=True)
+        return executor
+
+    def hash(self, password):
+        return self._submit(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._submit(check_password_hash, password_hash, password)
+
+    # True when a stored hash was produced with a different method or work
+    # factor than the one currently configured
+    def needs_rehash(self, password_hash):
+        return password_hash.split("$", 1)[0] != self.method
+
+
+password_hasher = PasswordHasher()
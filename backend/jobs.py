@@ -0,0 +1,441 @@
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, timedelta
+
+import export
+import listing
+from analytics import aggregate, period_args, period_range
+from categories import categories_for
+from errors import ApiError
+from json_provider import dumps
+from models import ReportJob, TransactionRollup, db
+from money import to_major
+from sqlalchemy import func, select, update
+from werkzeug.datastructures import MultiDict
+
+# A running job that has not reported progress for this long lost its worker
+STALE_AFTER = timedelta(minutes=10)
+EXPORT_FILTERS = ["period", "month", "year", "category_id", "type"]
+
+
+def _year(params):
+    try:
+        year = int(params.get("year", datetime.now().year))
+    except (TypeError, ValueError):
+        raise ApiError("Year must be an integer")
+    if not 1900 <= year <= 9999:
+        raise ApiError("Year must be between 1900 and 9999")
+    return year
+
+
+def _month(params):
+    if params.get("month") is None:
+        return None
+    try:
+        month = int(params["month"])
+    except (TypeError, ValueError):
+        raise ApiError("Month must be an integer")
+    if not 1 <= month <= 12:
+        raise ApiError("Month must be between 1 and 12")
+    return month
+
+
+def parse_export(params):
+    export_format = params.get("format", "csv")
+    if export_format not in export.FORMATS:
+        raise ApiError("Format must be either csv or ndjson")
+    parsed = {"format": export_format}
+    for name in EXPORT_FILTERS:
+        if params.get(name) is not None:
+            parsed[name] = str(params[name])
+    # Rejected now rather than when the job runs
+    period_args(MultiDict(parsed))
+    return parsed
+
+
+def parse_yearly_summary(params):
+    return {"year": _year(params)}
+
+
+def parse_category_breakdown(params):
+    return {"year": _year(params), "month": _month(params)}
+
+
+# Streams the export to path, reporting progress every export.CHUNK_SIZE rows
+def build_export(job, params, path, progress):
+    stmt = listing.filter_transactions(job.user_id, MultiDict(params))
+    total = db.session.scalar(
+        select(func.count()).select_from(stmt.order_by(None).subquery())
+    )
+
+    written = 0
+    with open(path, "w", newline="") as f:
+        for chunk in export.stream(stmt, params["format"]):
+            f.write(chunk)
+            written += export.CHUNK_SIZE
+            if total:
+                progress(min(99, written * 100 // total))
+
+    filename = f"transactions_{date.today().isoformat()}.{params['format']}"
+    return filename, export.FORMATS[params["format"]]
+
+
+def build_yearly_summary(job, params, path, progress):
+    year = params["year"]
+    start, end = period_range("yearly", None, year)
+    summary, chart_data = aggregate(job.user_id, start, end, "month", False)
+    report = {
+        "year": year,
+        "summary": summary,
+        "months": chart_data["timeline"],
+        "expenses_by_category": chart_data["expenses_by_category"],
+    }
+    with open(path, "wb") as f:
+        f.write(dumps(report))
+    return f"summary_{year}.json", "application/json"
+
+
+def build_category_breakdown(job, params, path, progress):
+    year, month = params["year"], params["month"]
+    start, end = period_range("monthly" if month else "yearly", month, year)
+    rows = db.session.execute(
+        select(
+            TransactionRollup.category_id,
+            TransactionRollup.type,
+            func.sum(TransactionRollup.total_cents),
+            func.sum(TransactionRollup.count),
+        )
+        .where(
+            TransactionRollup.user_id == job.user_id,
+            TransactionRollup.date >= start,
+            TransactionRollup.date < end,
+        )
+        .group_by(TransactionRollup.category_id, TransactionRollup.type)
+    ).all()
+
+    categories = categories_for({row.category_id for row in rows})
+    totals = {"expense": sum(r[2] for r in rows if r.type == "expense")}
+    totals["revenue"] = sum(r[2] for r in rows if r.type == "revenue")
+    report = {
+        "year": year,
+        "month": month,
+        "categories": [
+            {
+                "category": categories[category_id]["name"],
+                "icon": categories[category_id]["icon"],
+                "type": transaction_type,
+                "amount": to_major(cents),
+                "count": count,
+                "share": round(cents * 100 / totals[transaction_type], 1)
+                if totals[transaction_type]
+                else 0.0,
+            }
+            for category_id, transaction_type, cents, count in sorted(
+                rows, key=lambda row: (row.type, -row[2])
+            )
+        ],
+    }
+    with open(path, "wb") as f:
+        f.write(dumps(report))
+    suffix = f"{year}-{month:02d}" if month else str(year)
+    return f"categories_{suffix}.json", "application/json"
+
+
+# kind -> (parse the request params, build the report file)
+KINDS = {
+    "export": (parse_export, build_export),
+    "yearly_summary": (parse_yearly_summary, build_yearly_summary),
+    "category_breakdown": (parse_category_breakdown, build_category_breakdown),
+}
+
+
+def result_path(reports_dir, job_id):
+    return os.path.join(reports_dir, str(job_id))
+
+
+def serialize_job(job, retention):
+    return {
+        "id": job.id,
+        "type": job.kind,
+        "params": json.loads(job.params),
+        "status": job.status,
+        "progress": job.progress,
+        "error": job.error,
+        "created_at": job.created_at.isoformat(),
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "expires_at": (job.finished_at + retention).isoformat()
+        if job.finished_at
+        else None,
+        "download_url": f"/api/reports/{job.id}/download"
+        if job.status == "done"
+        else None,
+    }
+
+
+# Validates and queues a report; max_pending caps a user's queued and running
+# jobs so one account cannot monopolize the workers
+def enqueue(user_id, kind, params, max_pending):
+    if kind not in KINDS:
+        raise ApiError("Type must be one of " + ", ".join(KINDS))
+    if not isinstance(params, dict):
+        raise ApiError("Params must be an object")
+    parse, _ = KINDS[kind]
+    params = parse(params)
+
+    pending = db.session.scalar(
+        select(func.count(ReportJob.id)).where(
+            ReportJob.user_id == user_id,
+            ReportJob.status.in_(["queued", "running"]),
+        )
+    )
+    if pending >= max_pending:
+        raise ApiError(
+            "Too many reports in progress, please try again shortly",
+            429,
+            headers={"Retry-After": "5"},
+        )
+
+    job = ReportJob(user_id=user_id, kind=kind, params=json.dumps(params))
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+# Atomically moves the oldest queued job to running and returns its id; safe
+# with several dispatchers (web workers, jobs.py) sharing the database
+def claim_next():
+    now = datetime.utcnow()
+    oldest = (
+        select(ReportJob.id)
+        .where(ReportJob.status == "queued")
+        .order_by(ReportJob.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    job_id = db.session.execute(
+        update(ReportJob)
+        .where(ReportJob.id == oldest, ReportJob.status == "queued")
+        .values(status="running", started_at=now, updated_at=now)
+        .returning(ReportJob.id),
+        execution_options={"synchronize_session": False},
+    ).scalar()
+    db.session.commit()
+    return job_id
+
+
+# Progress and results are written on their own connection so they never
+# interfere with a report's open read cursor
+def _update_job(job_id, **values):
+    with db.engine.begin() as connection:
+        connection.execute(
+            update(ReportJob)
+            .where(ReportJob.id == job_id)
+            .values(updated_at=datetime.utcnow(), **values)
+        )
+
+
+def fail(job_id, message):
+    _update_job(job_id, status="failed", error=message, finished_at=datetime.utcnow())
+
+
+# Puts a claimed job that never reached a worker back in the queue
+def requeue(job_id):
+    _update_job(job_id, status="queued", started_at=None)
+
+
+# Runs in a pool worker process
+def run_job(job_id):
+    from app import app
+
+    with app.app_context():
+        job = db.session.get(ReportJob, job_id)
+        reports_dir = app.config["REPORTS_DIR"]
+        path = result_path(reports_dir, job_id)
+        _, build = KINDS[job.kind]
+        try:
+            os.makedirs(reports_dir, exist_ok=True)
+            filename, mimetype = build(
+                job,
+                json.loads(job.params),
+                path,
+                lambda percent: _update_job(job_id, progress=percent),
+            )
+            _update_job(
+                job_id,
+                status="done",
+                progress=100,
+                filename=filename,
+                mimetype=mimetype,
+                result_size=os.path.getsize(path),
+                finished_at=datetime.utcnow(),
+            )
+        except Exception as e:
+            if os.path.exists(path):
+                os.remove(path)
+            fail(job_id, str(e))
+
+
+# Deletes finished jobs (and their files) older than retention and fails
+# running jobs whose worker died
+def evict(reports_dir, retention):
+    now = datetime.utcnow()
+    expired = db.session.scalars(
+        select(ReportJob.id).where(
+            ReportJob.status.in_(["done", "failed"]),
+            ReportJob.finished_at < now - retention,
+        )
+    ).all()
+    for job_id in expired:
+        path = result_path(reports_dir, job_id)
+        if os.path.exists(path):
+            os.remove(path)
+    if expired:
+        db.session.execute(
+            ReportJob.__table__.delete().where(ReportJob.id.in_(expired))
+        )
+
+    db.session.execute(
+        update(ReportJob)
+        .where(ReportJob.status == "running", ReportJob.updated_at < now - STALE_AFTER)
+        .values(status="failed", error="Worker stopped", finished_at=now),
+        execution_options={"synchronize_session": False},
+    )
+    db.session.commit()
+    return len(expired)
+
+
+# Dispatches queued reports to a local process pool. A dispatcher thread
+# claims at most `workers` jobs at a time, so the pool never has a backlog of
+# its own and unclaimed jobs stay visible (and claimable by other processes)
+# in the table. Worker processes are spawned rather than forked: they start
+# clean instead of inheriting the server's threads, sockets and connections.
+class ReportRunner:
+    def __init__(self, workers=2, retention=timedelta(hours=24), poll_interval=2.0):
+        self.workers = workers
+        self.retention = retention
+        self.poll_interval = poll_interval
+        self._app = None
+        self._executor = None
+        self._thread = None
+        self._running = 0
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+
+    # Starts the dispatcher on first use; workers=0 leaves queued jobs for a
+    # separate `python jobs.py` process
+    def start(self, app):
+        if self.workers <= 0:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._app = app
+                self._executor = self._new_executor()
+                self._thread = threading.Thread(
+                    target=self._dispatch, name="report-dispatcher", daemon=True
+                )
+                self._thread.start()
+        self._wakeup.set()
+
+    def _new_executor(self):
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    # A worker process that dies (e.g. killed for memory) breaks the whole pool:
+    # every later submit raises BrokenProcessPool. Swap in a fresh pool, once
+    # per broken one, however many callbacks and submits notice it.
+    def _replace_executor(self, broken):
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._executor = self._new_executor()
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._app.logger.warning("Report worker pool broke, started a new one")
+
+    # Lets idle workers exit; a job still running is failed as stale later
+    def stop(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _finished(self, job_id, executor, future):
+        with self._lock:
+            self._running -= 1
+        if future.cancelled():
+            # Never started: the pool was shut down with the job still queued
+            with self._app.app_context():
+                requeue(job_id)
+            return
+        error = future.exception()
+        if error is not None:
+            # The worker process died (e.g. killed); run_job itself records
+            # ordinary failures
+            with self._app.app_context():
+                fail(job_id, f"Worker crashed: {error}")
+            if isinstance(error, BrokenProcessPool):
+                self._replace_executor(executor)
+        self._wakeup.set()
+
+    def _dispatch(self):
+        last_eviction = 0
+        while True:
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+            try:
+                with self._app.app_context():
+                    if time.monotonic() - last_eviction > 60:
+                        evict(self._app.config["REPORTS_DIR"], self.retention)
+                        last_eviction = time.monotonic()
+                    while self._running < self.workers:
+                        job_id = claim_next()
+                        if job_id is None:
+                            break
+                        with self._lock:
+                            self._running += 1
+                            executor = self._executor
+                        try:
+                            future = executor.submit(run_job, job_id)
+                        except BrokenProcessPool:
+                            with self._lock:
+                                self._running -= 1
+                            requeue(job_id)
+                            self._replace_executor(executor)
+                            continue
+                        future.add_done_callback(
+                            lambda f, job_id=job_id, executor=executor: (
+                                self._finished(job_id, executor, f)
+                            )
+                        )
+            except Exception as e:
+                self._app.logger.exception("Report dispatcher failed: %s", e)
+
+
+report_runner = ReportRunner()
+
+
+if __name__ == "__main__":
+    from app import app
+
+    # Standalone worker for deployments that set REPORT_WORKERS=0 on the
+    # web processes
+    report_runner.workers = max(1, int(os.environ.get("REPORT_WORKERS", 2)))
+    report_runner.start(app)
+    print(f"✅ Report worker running with {report_runner.workers} processes")
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        report_runner.stop()
@@ -0,0 +1,32 @@
+from decimal import Decimal
+
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+
+# Non-string keys (e.g. category ids) become strings, as with the stdlib
+OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(obj):
+    return orjson.dumps(obj, default=_default, option=OPTIONS)
+
+
+# jsonify() backed by orjson: serializes straight to bytes several times
+# faster than the stdlib encoder. Keys keep their insertion order.
+class OrjsonProvider(DefaultJSONProvider):
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
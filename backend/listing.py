@@ -0,0 +1,122 @@
+import base64
+from datetime import datetime
+
+from analytics import period_args, period_range
+from errors import ApiError
+from models import Transaction
+from serializers import serialize_columnar, serialize_transaction
+from sqlalchemy import select, tuple_
+
+MAX_PAGE_SIZE = 500
+LIST_FORMATS = ["json", "columnar"]
+
+# Plain rows are enough to serialize and skip building ORM objects
+COLUMNS = [
+    Transaction.id,
+    Transaction.date,
+    Transaction.category_id,
+    Transaction.description,
+    Transaction.amount_cents,
+    Transaction.type,
+]
+
+
+# Keyset pagination cursors are an opaque encoding of the last (date, id) seen
+def encode_cursor(transaction):
+    raw = f"{transaction.date.isoformat()}|{transaction.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    padded = cursor + "=" * (-len(cursor) % 4)
+    raw = base64.urlsafe_b64decode(padded.encode()).decode()
+    date_part, id_part = raw.split("|")
+    return datetime.strptime(date_part, "%Y-%m-%d").date(), int(id_part)
+
+
+def apply_period_filter(stmt, period, month, year):
+    bounds = period_range(period, month, year)
+    if bounds:
+        start, end = bounds
+        stmt = stmt.where(Transaction.date >= start, Transaction.date < end)
+    return stmt
+
+
+# The user's transactions matching the request filters, newest first. args is
+# a werkzeug MultiDict (Flask's request.args, or one built by asgi.py).
+def filter_transactions(user_id, args):
+    # Get query parameters for filtering
+    category_id = args.get("category_id", type=int)
+    transaction_type = args.get("type")
+    period, month, year = period_args(args)  # period is 'monthly' or 'yearly'
+
+    stmt = select(*COLUMNS).where(Transaction.user_id == user_id)
+
+    # Apply filters
+    if category_id:
+        stmt = stmt.where(Transaction.category_id == category_id)
+
+    if transaction_type:
+        stmt = stmt.where(Transaction.type == transaction_type)
+
+    stmt = apply_period_filter(stmt, period, month, year)
+
+    return stmt.order_by(Transaction.date.desc(), Transaction.id.desc())
+
+
+# Returns (statement, limit, format) for a listing request; the statement
+# fetches one row past the page so the caller can tell whether more follow.
+# date_range is an optional half-open (start, end) on top of the filters.
+def page_statement(user_id, args, date_range=None):
+    limit = args.get("limit", type=int)
+    cursor = args.get("cursor")
+    response_format = args.get("format", "json")
+    if response_format not in LIST_FORMATS:
+        raise ApiError("Format must be either json or columnar")
+
+    stmt = filter_transactions(user_id, args)
+    if date_range is not None:
+        start, end = date_range
+        stmt = stmt.where(Transaction.date >= start, Transaction.date < end)
+
+    # Cursor mode: seek past the last (date, id) instead of using OFFSET,
+    # so every page costs the same regardless of its depth
+    if limit is not None:
+        if limit < 1:
+            raise ApiError("Limit must be a positive integer")
+        limit = min(limit, MAX_PAGE_SIZE)
+
+        if cursor:
+            try:
+                cursor_date, cursor_id = decode_cursor(cursor)
+            except (ValueError, UnicodeDecodeError):
+                raise ApiError("Invalid cursor")
+            # A row-value comparison, not an OR of the two cases: the planner
+            # only turns the former into an index range on (user_id, date)
+            stmt = stmt.where(
+                tuple_(Transaction.date, Transaction.id)
+                < tuple_(cursor_date, cursor_id)
+            )
+
+        stmt = stmt.limit(limit + 1)
+
+    return stmt, limit, response_format
+
+
+# Builds the listing payload from the rows page_statement returned;
+# categories must cover every category id in them
+def page_response(transactions, limit, response_format, categories):
+    next_cursor = None
+    if limit is not None and len(transactions) > limit:
+        transactions = transactions[:limit]
+        next_cursor = encode_cursor(transactions[-1])
+
+    if response_format == "columnar":
+        response = {"transactions": serialize_columnar(transactions, categories)}
+    else:
+        response = {
+            "transactions": [serialize_transaction(t, categories) for t in transactions]
+        }
+    if limit is not None:
+        response["next_cursor"] = next_cursor
+    return response
@@ -0,0 +1,157 @@
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from datetime import date
+
+import httpx
+
+SERVERS = {
+    # Flask's threaded development server, i.e. `python app.py` without debug
+    "sync": ["-m", "flask", "--app", "app", "run", "--with-threads", "--port"],
+    "async": ["-m", "uvicorn", "asgi:app", "--log-level", "warning", "--port"],
+}
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = int(round(fraction * (len(sorted_values) - 1)))
+    return sorted_values[min(len(sorted_values) - 1, index)]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare concurrent-client throughput of the sync and async "
+        "servers on the read endpoints."
+    )
+    parser.add_argument("--servers", default="sync,async")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--port", type=int, default=5100)
+    parser.add_argument("--output", help="write the results as JSON")
+    return parser.parse_args(argv)
+
+
+def read_urls(today):
+    month = f"period=monthly&month={today.month}&year={today.year}"
+    year = f"period=yearly&year={today.year}"
+    return [
+        "/api/transactions?limit=50",
+        f"/api/transactions?{month}",
+        f"/api/analytics/summary?{month}",
+        f"/api/analytics/summary?{year}",
+        f"/api/analytics/charts?{month}",
+        f"/api/analytics/charts?{year}",
+        "/api/categories",
+    ]
+
+
+def start_server(name, port):
+    process = subprocess.Popen(
+        [sys.executable, *SERVERS[name], str(port)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        # One user drives all the clients; measure capacity, not the limits
+        env={**os.environ, "RATE_LIMIT_ENABLED": "0", "MAX_IN_FLIGHT": "0"},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            httpx.get(f"{base_url}/api/categories")
+            return process, base_url
+        except httpx.TransportError:
+            time.sleep(0.1)
+    stop_server(process)
+    raise RuntimeError(f"{name} server did not start on port {port}")
+
+
+# The password hashing and report pools start worker processes that may
+# outlive a server killed mid-request, so once the server has exited kill
+# whatever is left of its process group
+def stop_server(process):
+    process.terminate()
+    process.wait()
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+# Every client loops over the read URLs until the deadline; each request
+# sends no If-None-Match, so the full query and response are measured
+async def run_clients(base_url, headers, urls, clients, duration):
+    latencies = []
+    errors = 0
+
+    async def client(index, http):
+        nonlocal errors
+        deadline = time.perf_counter() + duration
+        i = index
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            response = await http.get(urls[i % len(urls)], headers=headers)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+            i += 1
+
+    limits = httpx.Limits(max_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as http:
+        started = time.perf_counter()
+        await asyncio.gather(*(client(i, http) for i in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+    }
+
+
+def main(options):
+    urls = read_urls(date.today())
+    results = {"clients": options.clients, "duration": options.duration}
+
+    for name in options.servers.split(","):
+        process, base_url = start_server(name, options.port)
+        try:
+            response = httpx.post(
+                f"{base_url}/api/login",
+                json={"username": "demo", "password": "demo123"},
+                timeout=60,
+            )
+            headers = {"Authorization": f"Bearer {response.json()['token']}"}
+            print(f"Load testing the {name} server with {options.clients} clients...")
+            results[name] = asyncio.run(
+                run_clients(base_url, headers, urls, options.clients, options.duration)
+            )
+        finally:
+            stop_server(process)
+
+        print(
+            f"   {name:<6} {results[name]['throughput_rps']:>8.1f} req/s  "
+            f"p50 {results[name]['p50_ms']:>8.2f}ms  "
+            f"p95 {results[name]['p95_ms']:>8.2f}ms  "
+            f"p99 {results[name]['p99_ms']:>8.2f}ms  "
+            f"{results[name]['errors']} errors"
+        )
+
+    if options.output:
+        with open(options.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Results written to {options.output}")
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,187 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(
+                f"{name}_bucket{format_labels(labels, le=repr(bound))} {cumulative}"
+            )
+        lines.append(f"{name}_bucket{format_labels(labels, le='+Inf')} {self.count}")
+        lines.append(f"{name}_sum{format_labels(labels)} {self.sum}")
+        lines.append(f"{name}_count{format_labels(labels)} {self.count}")
+        return lines
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels, **extra):
+    pairs = {**labels, **extra}
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in pairs.items()) + "}"
+
+
+# In-process metrics registry rendered in the Prometheus text format. Each
+# worker process keeps its own registry.
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.request_latency = {}
+        self.responses = {}
+        self.sql_latency = {}
+        self.collectors = []
+
+    def request_started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def request_finished(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def observe_request(self, route, method, status, seconds):
+        with self._lock:
+            key = (route, method)
+            if key not in self.request_latency:
+                self.request_latency[key] = Histogram(REQUEST_BUCKETS)
+            self.request_latency[key].observe(seconds)
+            key = (route, method, status)
+            self.responses[key] = self.responses.get(key, 0) + 1
+
+    def observe_sql(self, route, seconds):
+        with self._lock:
+            if route not in self.sql_latency:
+                self.sql_latency[route] = Histogram(SQL_BUCKETS)
+            self.sql_latency[route].observe(seconds)
+
+    # Collectors return (name, type, help, value) tuples for state owned by
+    # other modules, such as cache hit counters
+    def add_collector(self, collector):
+        self.collectors.append(collector)
+
+    def render(self):
+        lines = []
+        with self._lock:
+            lines.append("# HELP http_requests_in_flight Requests being served")
+            lines.append("# TYPE http_requests_in_flight gauge")
+            lines.append(f"http_requests_in_flight {self.in_flight}")
+
+            lines.append("# HELP http_requests_total Responses by route and status")
+            lines.append("# TYPE http_requests_total counter")
+            for (route, method, status), count in sorted(self.responses.items()):
+                labels = {"route": route, "method": method, "status": status}
+                lines.append(f"http_requests_total{format_labels(labels)} {count}")
+
+            lines.append(
+                "# HELP http_request_duration_seconds Request latency by route"
+            )
+            lines.append("# TYPE http_request_duration_seconds histogram")
+            for (route, method), histogram in sorted(self.request_latency.items()):
+                lines.extend(
+                    histogram.render(
+                        "http_request_duration_seconds",
+                        {"route": route, "method": method},
+                    )
+                )
+
+            lines.append("# HELP db_statement_duration_seconds SQL latency by route")
+            lines.append("# TYPE db_statement_duration_seconds histogram")
+            for route, histogram in sorted(self.sql_latency.items()):
+                lines.extend(
+                    histogram.render("db_statement_duration_seconds", {"route": route})
+                )
+
+        for collector in self.collectors:
+            for name, metric_type, help_text, value in collector():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                lines.append(f"{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# Route of a request served outside Flask (the native endpoints in asgi.py)
+route_label = ContextVar("route_label", default="none")
+
+
+def current_route():
+    if not has_request_context():
+        return route_label.get()
+    return request.url_rule.rule if request.url_rule else "unmatched"
+
+
+# Hooks are only installed when metrics are enabled, so a disabled registry
+# costs nothing per request or per statement
+def init_app(app, engine):
+    @app.before_request
+    def start_timer():
+        g.metrics_started = time.perf_counter()
+        g.metrics_in_flight = True
+        registry.request_started()
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop("metrics_started", None)
+        if started is not None:
+            registry.observe_request(
+                current_route(),
+                request.method,
+                str(response.status_code),
+                time.perf_counter() - started,
+            )
+        return response
+
+    @app.teardown_request
+    def finish_request(exc):
+        if g.pop("metrics_in_flight", False):
+            registry.request_finished()
+
+    init_engine(engine)
+
+
+# SQL latency hooks on their own, for engines not used through Flask
+def init_engine(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_statement(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["metrics_started"].pop()
+        registry.observe_sql(current_route(), time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def discard_statement(context):
+        if context.connection is not None:
+            started = context.connection.info.get("metrics_started")
+            if started:
+                started.pop()
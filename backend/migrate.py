@@ -0,0 +1,118 @@
+import rollups
+import search
+from app import app
+from models import TransactionRollup, TransactionTombstone, User, db
+from money import SCALE
+from sqlalchemy import inspect, update
+from sqlalchemy.schema import CreateColumn
+
+
+# Decimal columns replaced by integer minor-unit columns:
+# (table, old column, new column, nullable)
+MONEY_COLUMNS = [
+    ("transactions", "amount", "amount_cents", False),
+    ("users", "monthly_spending_threshold", "monthly_spending_threshold_cents", True),
+]
+
+
+def convert_money_columns():
+    inspector = inspect(db.engine)
+    for table, old, new, nullable in MONEY_COLUMNS:
+        if not inspector.has_table(table):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table)}
+        if old not in existing:
+            continue
+
+        with db.engine.begin() as connection:
+            if new not in existing:
+                constraint = "" if nullable else " NOT NULL DEFAULT 0"
+                connection.exec_driver_sql(
+                    f"ALTER TABLE {table} ADD COLUMN {new} BIGINT{constraint}"
+                )
+            connection.exec_driver_sql(
+                f"UPDATE {table} SET {new} = CAST(ROUND({old} * {SCALE}) AS BIGINT)"
+            )
+            connection.exec_driver_sql(f"ALTER TABLE {table} DROP COLUMN {old}")
+        print(f"   - {table}.{old} -> {table}.{new}")
+
+    # The rollup table is derived data: drop the decimal version and let it
+    # be recreated and rebuilt below
+    rollup_table = TransactionRollup.__tablename__
+    if inspector.has_table(rollup_table) and "total" in {
+        column["name"] for column in inspector.get_columns(rollup_table)
+    }:
+        TransactionRollup.__table__.drop(bind=db.engine)
+
+
+# Tombstones used to be keyed on the transaction id alone, so a reused id
+# could move one to another user. The old table is dropped and recreated
+# keyed per user; the dropped deletes can no longer be reported, so every
+# existing sync cursor is answered with a reset.
+def rekey_tombstones():
+    inspector = inspect(db.engine)
+    tombstone_table = TransactionTombstone.__tablename__
+    if not inspector.has_table(tombstone_table):
+        return False
+    if inspector.get_pk_constraint(tombstone_table)["constrained_columns"] != ["id"]:
+        return False
+    TransactionTombstone.__table__.drop(bind=db.engine)
+    return True
+
+
+def migrate_database():
+    with app.app_context():
+        print("Converting amounts to integer cents...")
+        convert_money_columns()
+        tombstones_rekeyed = rekey_tombstones()
+
+        # New tables are created outright; indexes added to existing tables
+        # are not picked up by create_all, so create any that are missing
+        db.create_all()
+
+        # Likewise for columns added to existing tables; they all carry a
+        # server default so existing rows stay valid
+        print("Adding missing columns...")
+        inspector = inspect(db.engine)
+        for table in db.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    ddl = CreateColumn(column).compile(dialect=db.engine.dialect)
+                    with db.engine.begin() as connection:
+                        connection.exec_driver_sql(
+                            f"ALTER TABLE {table.name} ADD COLUMN {ddl}"
+                        )
+                    print(f"   - {table.name}.{column.name}")
+
+        if tombstones_rekeyed:
+            print("Resetting sync cursors for the rekeyed tombstones...")
+            with db.engine.begin() as connection:
+                connection.execute(
+                    update(User.__table__).values(
+                        changes_horizon=User.__table__.c.data_version
+                    )
+                )
+
+        print("Creating missing indexes...")
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=db.engine, checkfirst=True)
+                print(f"   - {table.name}.{index.name}")
+
+        # The full-text index is a virtual table that create_all does not know
+        # about; creating it also fills it from the existing transactions
+        if search.is_supported() and not search.has_index():
+            print("Building the search index...")
+            search.create_index()
+
+        # Analytics read from the rollup table, so backfill it from the raw
+        # transactions (idempotent, safe to re-run)
+        print("Rebuilding transaction rollups...")
+        rollups.rebuild()
+
+        print("✅ Database migrated successfully!")
+
+
+if __name__ == "__main__":
+    migrate_database()
@@ -18,9 +18,18 @@ class User(db.Model):
     age = db.Column(db.Integer, nullable=True)
     occupation = db.Column(db.String(100), nullable=True)
     family_situation = db.Column(db.String(50), nullable=True)
-    monthly_spending_threshold = db.Column(db.Numeric(10, 2), nullable=True)
+    # In minor units (cents), see money.py
+    monthly_spending_threshold_cents = db.Column(db.BigInteger, nullable=True)
     financial_goal = db.Column(db.String(200), nullable=True)
 
+    # Bumped by every transaction/category change, see versions.py
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    # Highest change_seq whose tombstones were pruned; older sync cursors
+    # must reload, see changes.py
+    changes_horizon = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+
     transactions = db.relationship(
         "Transaction", backref="user", lazy=True, cascade="all, delete-orphan"
     )
@@ -45,15 +54,116 @@ class Category(db.Model):
 
 class Transaction(db.Model):
     __tablename__ = "transactions"
+    __table_args__ = (
+        db.Index("ix_transactions_user_date", "user_id", "date"),
+        db.Index("ix_transactions_user_type_date", "user_id", "type", "date"),
+        db.Index(
+            "ix_transactions_user_category_date", "user_id", "category_id", "date"
+        ),
+        db.Index("ix_transactions_user_change_seq", "user_id", "change_seq"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     date = db.Column(db.Date, nullable=False)
     category_id = db.Column(db.Integer, db.ForeignKey("categories.id"), nullable=False)
     description = db.Column(db.String(200), nullable=False)
-    amount = db.Column(db.Numeric(10, 2), nullable=False)
+    amount_cents = db.Column(db.BigInteger, nullable=False)  # minor units
     type = db.Column(db.String(10), nullable=False)  # 'expense' or 'revenue'
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+    # The user's data version when the row was last written, see changes.py
+    change_seq = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    def __repr__(self):
+        return f"<Transaction {self.description} - {self.amount_cents}>"
+
+
+class TransactionTombstone(db.Model):
+    __tablename__ = "transaction_tombstones"
+    __table_args__ = (
+        db.Index("ix_transaction_tombstones_user_change_seq", "user_id", "change_seq"),
+    )
+
+    # Left behind by deleted transactions so delta sync can report them. Keyed
+    # per user: SQLite may hand a deleted id to another user's next row.
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    change_seq = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<TransactionTombstone {self.id}>"
+
+
+class TransactionRollup(db.Model):
+    __tablename__ = "transaction_rollups"
+    __table_args__ = (
+        db.UniqueConstraint(
+            "user_id", "date", "category_id", "type", name="uq_transaction_rollups_key"
+        ),
+        db.Index("ix_transaction_rollups_user_year_month", "user_id", "year", "month"),
+    )
+
+    # Per-user daily totals by category and type, maintained alongside
+    # every transaction mutation so analytics never scan raw transactions
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    year = db.Column(db.Integer, nullable=False)
+    month = db.Column(db.Integer, nullable=False)
+    day = db.Column(db.Integer, nullable=False)
+    category_id = db.Column(db.Integer, db.ForeignKey("categories.id"), nullable=False)
+    type = db.Column(db.String(10), nullable=False)  # 'expense' or 'revenue'
+    total_cents = db.Column(db.BigInteger, nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<TransactionRollup {self.user_id} {self.date} {self.type}>"
+
+
+class MonthlyTotal(db.Model):
+    __tablename__ = "monthly_totals"
+    __table_args__ = (db.Index("ix_monthly_totals_year_month", "year", "month"),)
+
+    # Per-user running expense total for each month, maintained with the
+    # rollups so threshold checks are a single primary-key lookup
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+    year = db.Column(db.Integer, primary_key=True)
+    month = db.Column(db.Integer, primary_key=True)
+    expense_cents = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<MonthlyTotal {self.user_id} {self.year}-{self.month}>"
+
+
+class ReportJob(db.Model):
+    __tablename__ = "report_jobs"
+    __table_args__ = (
+        db.Index("ix_report_jobs_status_id", "status", "id"),
+        db.Index("ix_report_jobs_user_id", "user_id", "id"),
+    )
+
+    # A queued report; the table doubles as the work queue, see jobs.py
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    kind = db.Column(db.String(30), nullable=False)
+    params = db.Column(db.Text, nullable=False)  # JSON
+    # 'queued', 'running', 'done' or 'failed'
+    status = db.Column(db.String(10), nullable=False, default="queued")
+    progress = db.Column(db.Integer, nullable=False, default=0)  # percent
+    error = db.Column(db.Text, nullable=True)
+    filename = db.Column(db.String(100), nullable=True)
+    mimetype = db.Column(db.String(50), nullable=True)
+    result_size = db.Column(db.BigInteger, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    # Touched on every progress update; a running job that stops updating it
+    # lost its worker
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     def __repr__(self):
-        return f"<Transaction {self.description} - {self.amount}>"
+        return f"<ReportJob {self.id} {self.kind} {self.status}>"
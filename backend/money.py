@@ -0,0 +1,30 @@
+from decimal import Decimal, InvalidOperation
+
+# Amounts are stored as integers in minor units (cents). The API keeps
+# exchanging major-unit numbers, converted only here at the JSON boundary.
+CURRENCY_EXPONENT = 2
+SCALE = 10**CURRENCY_EXPONENT
+QUANTUM = Decimal(1).scaleb(-CURRENCY_EXPONENT)
+
+
+# Parses an API amount (number or numeric string) into minor units, rounding
+# half-even to the currency precision; raises ValueError if not finite
+def to_minor(amount):
+    try:
+        value = Decimal(str(amount))
+    except InvalidOperation:
+        raise ValueError("Amount must be a number")
+    if not value.is_finite():
+        raise ValueError("Amount must be a number")
+    return int(value.quantize(QUANTUM).scaleb(CURRENCY_EXPONENT))
+
+
+def to_major(minor):
+    return minor / SCALE
+
+
+# Exact fixed-point text, e.g. 1234 -> "12.34", for exports
+def format_minor(minor):
+    sign = "-" if minor < 0 else ""
+    whole, fraction = divmod(abs(minor), SCALE)
+    return f"{sign}{whole}.{fraction:0{CURRENCY_EXPONENT}d}"
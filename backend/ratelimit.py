@@ -0,0 +1,144 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from errors import ApiError
+from flask import g, jsonify, request
+
+ROUTE_CLASSES = ["auth", "reads", "writes", "exports"]
+AUTH_ENDPOINTS = {"login", "register"}
+EXPORT_ENDPOINTS = {"export_transactions", "create_report", "download_report"}
+# Monitoring has to keep working when the server is overloaded
+EXEMPT_ENDPOINTS = {"get_metrics"}
+
+
+# "<requests>/<seconds>", e.g. 600/60: bursts of up to 600 requests, refilled
+# at 10 per second. "0" turns the limit off.
+def parse_limit(value):
+    if value.strip() == "0":
+        return None
+    try:
+        requests, seconds = value.split("/")
+        requests, seconds = int(requests), float(seconds)
+    except ValueError:
+        raise ValueError(f"Rate limits look like 600/60, got {value!r}")
+    if requests < 1 or seconds <= 0:
+        raise ValueError(f"Rate limits must be positive, got {value!r}")
+    return requests, requests / seconds
+
+
+def route_class(endpoint, method):
+    if endpoint in AUTH_ENDPOINTS:
+        return "auth"
+    if endpoint in EXPORT_ENDPOINTS:
+        return "exports"
+    return "reads" if method in ("GET", "HEAD") else "writes"
+
+
+# Token buckets per (route class, key), where the key is the user id, or the
+# client address for the auth routes. A key may burst up to the bucket size
+# and is then held to the refill rate. Buckets refill lazily when checked, so
+# a check is a dict lookup and some arithmetic under a lock. The table is an
+# LRU capped at maxsize like the token cache; an evicted bucket comes back
+# full, which only favours the keys idle the longest.
+class RateLimiter:
+    def __init__(self, limits=None, maxsize=100000):
+        self.limits = limits or {}  # route class -> (capacity, refill per second)
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self.rejected = dict.fromkeys(ROUTE_CLASSES, 0)
+
+    def check(self, key, route_class):
+        limit = self.limits.get(route_class)
+        if limit is None:
+            return
+        capacity, rate = limit
+        bucket_key = (route_class, key)
+        now = time.monotonic()
+
+        with self._lock:
+            bucket = self._buckets.get(bucket_key)
+            if bucket is None:
+                tokens = capacity
+            else:
+                tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+                self._buckets.move_to_end(bucket_key)
+            if tokens >= 1:
+                self._buckets[bucket_key] = (tokens - 1, now)
+            else:
+                self._buckets[bucket_key] = (tokens, now)
+                self.rejected[route_class] += 1
+            if len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+
+        if tokens < 1:
+            raise ApiError(
+                "Too many requests, please slow down",
+                429,
+                headers={"Retry-After": str(math.ceil((1 - tokens) / rate))},
+            )
+
+    def stats(self):
+        with self._lock:
+            return {"buckets": len(self._buckets), "rejected": dict(self.rejected)}
+
+
+# Caps the requests this process handles at once; beyond max_in_flight they
+# are shed with a 503 straight away rather than queueing and slowing everyone
+# down. max_in_flight=0 admits everything. Also usable as a context manager.
+class AdmissionControl:
+    def __init__(self, max_in_flight=0):
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def enter(self):
+        with self._lock:
+            if self.max_in_flight and self.in_flight >= self.max_in_flight:
+                self.rejected += 1
+                raise ApiError(
+                    "Server is busy, please try again shortly",
+                    503,
+                    headers={"Retry-After": "1"},
+                )
+            self.in_flight += 1
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def __enter__(self):
+        self.enter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.leave()
+
+
+rate_limiter = RateLimiter()
+admission = AdmissionControl()
+
+
+# Admission control for every request and the per-address limit for the auth
+# routes; token_required applies the per-user limits once it knows the user
+def init_app(app):
+    @app.before_request
+    def admit_request():
+        if request.method == "OPTIONS" or request.endpoint in EXEMPT_ENDPOINTS:
+            return None
+        try:
+            admission.enter()
+            g.admitted = True
+            if request.endpoint in AUTH_ENDPOINTS:
+                rate_limiter.check(request.remote_addr, "auth")
+        except ApiError as e:
+            return jsonify({"message": e.message}), e.status_code, e.headers
+        return None
+
+    @app.teardown_request
+    def release_request(exc):
+        if g.pop("admitted", False):
+            admission.leave()
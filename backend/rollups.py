@@ -0,0 +1,248 @@
+import sys
+
+import events
+from models import MonthlyTotal, Transaction, TransactionRollup, db
+from sqlalchemy import extract, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+rollup_table = TransactionRollup.__table__
+monthly_table = MonthlyTotal.__table__
+
+
+# The rollup key and amount in cents a transaction contributes; taken before an
+# update so the old contribution can be backed out in the same DB transaction
+def snapshot(transaction):
+    return (
+        transaction.user_id,
+        transaction.date,
+        transaction.category_id,
+        transaction.type,
+        transaction.amount_cents,
+    )
+
+
+def apply(entry, sign=1):
+    apply_deltas(collect([entry], sign))
+
+
+# Folds many snapshots into per-key (total, count) deltas so bulk mutations
+# touch each rollup row once
+def collect(entries, sign=1, deltas=None):
+    deltas = {} if deltas is None else deltas
+    for user_id, day, category_id, transaction_type, cents in entries:
+        key = (user_id, day, category_id, transaction_type)
+        total, count = deltas.get(key, (0, 0))
+        deltas[key] = (total + cents * sign, count + sign)
+    return deltas
+
+
+def apply_deltas(deltas):
+    if not deltas:
+        return
+
+    dialect = db.session.get_bind().dialect.name
+    upsert = (postgresql if dialect == "postgresql" else sqlite).insert
+
+    stmt = upsert(rollup_table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "date", "category_id", "type"],
+        set_={
+            "total_cents": rollup_table.c.total_cents + stmt.excluded.total_cents,
+            "count": rollup_table.c.count + stmt.excluded.count,
+        },
+    )
+    params = []
+    for key, (total, count) in deltas.items():
+        user_id, day, category_id, transaction_type = key
+        params.append(
+            {
+                "user_id": user_id,
+                "date": day,
+                "year": day.year,
+                "month": day.month,
+                "day": day.day,
+                "category_id": category_id,
+                "type": transaction_type,
+                "total_cents": total,
+                "count": count,
+            }
+        )
+    db.session.execute(stmt, params)
+
+    # Drop rows whose last transaction was removed
+    if any(count < 0 for _, count in deltas.values()):
+        user_ids = {key[0] for key in deltas}
+        db.session.execute(
+            rollup_table.delete().where(
+                rollup_table.c.user_id.in_(user_ids), rollup_table.c.count <= 0
+            )
+        )
+
+    apply_monthly_deltas(upsert, deltas)
+    events.stage(deltas)
+
+
+# Folds the expense part of rollup deltas into per-user monthly running totals
+def apply_monthly_deltas(upsert, deltas):
+    months = {}
+    for (user_id, day, _, transaction_type), (total, _) in deltas.items():
+        if transaction_type == "expense" and total:
+            key = (user_id, day.year, day.month)
+            months[key] = months.get(key, 0) + total
+    if not months:
+        return
+
+    stmt = upsert(monthly_table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "year", "month"],
+        set_={
+            "expense_cents": monthly_table.c.expense_cents
+            + stmt.excluded.expense_cents
+        },
+    )
+    db.session.execute(
+        stmt,
+        [
+            {"user_id": user_id, "year": year, "month": month, "expense_cents": cents}
+            for (user_id, year, month), cents in months.items()
+        ],
+    )
+
+
+def apply_period_filter(query, period, month, year):
+    if period == "monthly" and month:
+        query = query.filter(
+            TransactionRollup.year == year, TransactionRollup.month == month
+        )
+    elif period == "yearly":
+        query = query.filter(TransactionRollup.year == year)
+    return query
+
+
+def _raw_aggregates(user_id=None):
+    query = db.session.query(
+        Transaction.user_id,
+        Transaction.date,
+        extract("year", Transaction.date),
+        extract("month", Transaction.date),
+        extract("day", Transaction.date),
+        Transaction.category_id,
+        Transaction.type,
+        func.sum(Transaction.amount_cents),
+        func.count(Transaction.id),
+    )
+    if user_id is not None:
+        query = query.filter(Transaction.user_id == user_id)
+    return query.group_by(
+        Transaction.user_id,
+        Transaction.date,
+        Transaction.category_id,
+        Transaction.type,
+    )
+
+
+# Monthly expense totals derived from the (already consistent) rollup table
+def _monthly_aggregates(user_id=None):
+    stmt = select(
+        rollup_table.c.user_id,
+        rollup_table.c.year,
+        rollup_table.c.month,
+        func.sum(rollup_table.c.total_cents),
+    ).where(rollup_table.c.type == "expense")
+    if user_id is not None:
+        stmt = stmt.where(rollup_table.c.user_id == user_id)
+    return stmt.group_by(
+        rollup_table.c.user_id, rollup_table.c.year, rollup_table.c.month
+    )
+
+
+def rebuild(user_id=None):
+    for table in (rollup_table, monthly_table):
+        delete = table.delete()
+        if user_id is not None:
+            delete = delete.where(table.c.user_id == user_id)
+        db.session.execute(delete)
+
+    columns = [
+        "user_id",
+        "date",
+        "year",
+        "month",
+        "day",
+        "category_id",
+        "type",
+        "total_cents",
+        "count",
+    ]
+    db.session.execute(
+        insert(rollup_table).from_select(columns, _raw_aggregates(user_id))
+    )
+    db.session.execute(
+        insert(monthly_table).from_select(
+            ["user_id", "year", "month", "expense_cents"], _monthly_aggregates(user_id)
+        )
+    )
+    db.session.commit()
+
+
+# Returns (key, expected, actual) for every rollup row that disagrees with
+# the raw transactions table, then for every monthly total that disagrees
+# with the rollups; an empty list means both are consistent
+def check(user_id=None):
+    expected = {
+        (row[0], row[1], row[5], row[6]): (row[7], row[8])
+        for row in _raw_aggregates(user_id)
+    }
+
+    query = TransactionRollup.query
+    if user_id is not None:
+        query = query.filter(TransactionRollup.user_id == user_id)
+    actual = {
+        (r.user_id, r.date, r.category_id, r.type): (r.total_cents, r.count)
+        for r in query
+    }
+
+    mismatches = [
+        (key, expected.get(key), actual.get(key))
+        for key in sorted(set(expected) | set(actual))
+        if expected.get(key) != actual.get(key)
+    ]
+
+    expected = {
+        (row[0], row[1], row[2]): row[3]
+        for row in db.session.execute(_monthly_aggregates(user_id))
+    }
+    query = MonthlyTotal.query
+    if user_id is not None:
+        query = query.filter(MonthlyTotal.user_id == user_id)
+    # Months whose expenses were all deleted keep a zero row
+    actual = {(m.user_id, m.year, m.month): m.expense_cents for m in query}
+    mismatches += [
+        (key, expected.get(key, 0), actual.get(key, 0))
+        for key in sorted(set(expected) | set(actual))
+        if expected.get(key, 0) != actual.get(key, 0)
+    ]
+    return mismatches
+
+
+if __name__ == "__main__":
+    from app import app
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "check"
+    user_id = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    with app.app_context():
+        if command == "rebuild":
+            rebuild(user_id)
+            print("✅ Transaction rollups rebuilt")
+        elif command == "check":
+            mismatches = check(user_id)
+            for key, expected, actual in mismatches:
+                print(f"   - {key}: expected {expected}, found {actual}")
+            if mismatches:
+                print(f"❌ {len(mismatches)} rollup rows are inconsistent")
+                sys.exit(1)
+            print("✅ Transaction rollups are consistent")
+        else:
+            print("Usage: python rollups.py [rebuild|check] [user_id]")
+            sys.exit(2)
@@ -0,0 +1,161 @@
+import re
+import sys
+
+from errors import ApiError
+from listing import MAX_PAGE_SIZE, filter_transactions
+from models import Transaction, db
+from sqlalchemy import column, exc, inspect, literal_column, table, text
+
+DEFAULT_LIMIT = 50
+FTS_TABLE = "transactions_fts"
+
+# External-content FTS5 index over transactions.description: the index only
+# stores tokens and points back at transactions.id, and triggers keep it in
+# step with every insert, update and delete (including the bulk endpoints).
+# user_id is indexed too so a search only ranks the caller's own matches
+# rather than every user's; the rank function gives it no weight.
+# prefix='2 3' adds prefix indexes so short "gro*" style queries stay cheap.
+SCHEMA = [
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        description,
+        user_id,
+        content='transactions',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )""",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('rank', 'bm25(1.0, 0.0)')",
+    f"""CREATE TRIGGER {FTS_TABLE}_insert AFTER INSERT ON transactions BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, description, user_id)
+        VALUES (new.id, new.description, new.user_id);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_delete AFTER DELETE ON transactions BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description, user_id)
+        VALUES ('delete', old.id, old.description, old.user_id);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_update AFTER UPDATE OF description, user_id
+    ON transactions BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description, user_id)
+        VALUES ('delete', old.id, old.description, old.user_id);
+        INSERT INTO {FTS_TABLE}(rowid, description, user_id)
+        VALUES (new.id, new.description, new.user_id);
+    END""",
+]
+
+fts_table = table(FTS_TABLE, column("rowid"), column("rank"))
+
+
+def is_supported():
+    return db.session.get_bind().dialect.name == "sqlite"
+
+
+def has_index():
+    return inspect(db.session.get_bind()).has_table(FTS_TABLE)
+
+
+# (Re)creates the index and its triggers and fills it from the transactions
+# table; loaders call this once after inserting their rows
+def create_index():
+    for trigger in ("insert", "delete", "update"):
+        db.session.execute(text(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{trigger}"))
+    db.session.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+    for statement in SCHEMA:
+        db.session.execute(text(statement))
+    rebuild()
+
+
+# Creates the index if it is missing, e.g. on a database made by create_all;
+# rows inserted before then are picked up by the initial rebuild
+def ensure_index():
+    if is_supported() and not has_index():
+        create_index()
+
+
+def rebuild():
+    db.session.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    db.session.commit()
+
+
+# Raises if the index is corrupt or disagrees with the transactions table
+def check():
+    db.session.execute(
+        text(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) "
+            "VALUES ('integrity-check', 1)"
+        )
+    )
+
+
+# Every word of the query must match, each as a prefix: "gro din" finds
+# "Groceries" and "Restaurant dinner". Words are quoted, so FTS5 operators
+# and column filters typed by the user are matched as plain text.
+def parse_query(q):
+    terms = re.findall(r"\w+", q or "")
+    if not terms:
+        raise ApiError("Search query is required")
+    return terms
+
+
+def match_expression(user_id, terms):
+    words = " ".join(f'"{term}"*' for term in terms)
+    return f'user_id : "{int(user_id)}" AND description : ({words})'
+
+
+# Returns (statement, limit, offset) for a search request. Results are ordered
+# by relevance (bm25), newest first among equally relevant matches, and the
+# statement fetches one row past the page like listing.page_statement.
+def search_statement(user_id, args, dialect):
+    terms = parse_query(args.get("q"))
+    limit = args.get("limit", DEFAULT_LIMIT, type=int)
+    offset = args.get("offset", 0, type=int)
+    if limit < 1:
+        raise ApiError("Limit must be a positive integer")
+    if offset < 0:
+        raise ApiError("Offset must not be negative")
+    limit = min(limit, MAX_PAGE_SIZE)
+
+    stmt = filter_transactions(user_id, args).order_by(None)
+    if dialect == "sqlite":
+        expression = match_expression(user_id, terms)
+        stmt = (
+            stmt.join(fts_table, fts_table.c.rowid == Transaction.id)
+            .where(literal_column(FTS_TABLE).op("MATCH")(expression))
+            .order_by(fts_table.c.rank)
+        )
+    else:
+        # No FTS5 outside SQLite: fall back to substring matching
+        for term in terms:
+            stmt = stmt.where(Transaction.description.ilike(f"%{term}%"))
+
+    stmt = stmt.order_by(Transaction.date.desc(), Transaction.id.desc())
+    return stmt.limit(limit + 1).offset(offset), limit, offset
+
+
+if __name__ == "__main__":
+    from app import app
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "check"
+
+    with app.app_context():
+        if not is_supported():
+            print("❌ Full-text search needs SQLite with FTS5")
+            sys.exit(1)
+        if command == "create":
+            create_index()
+            print("✅ Search index created")
+        elif command == "rebuild":
+            rebuild()
+            print("✅ Search index rebuilt")
+        elif command == "check":
+            if not has_index():
+                print("❌ No search index, create it with: python search.py create")
+                sys.exit(1)
+            try:
+                check()
+            except exc.DatabaseError as e:
+                print(f"❌ Search index is inconsistent: {e.orig}")
+                sys.exit(1)
+            print("✅ Search index is consistent")
+        else:
+            print("Usage: python search.py [create|rebuild|check]")
+            sys.exit(2)
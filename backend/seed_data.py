@@ -1,10 +1,100 @@
 import random
 from datetime import datetime, timedelta
 
+import rollups
+import search
 from app import app
 from models import Category, Transaction, User, db
+from money import to_minor
 from werkzeug.security import generate_password_hash
 
+# Expense descriptions by category
+EXPENSE_DESCRIPTIONS = {
+    "Grocery": [
+        "Weekly groceries",
+        "Supermarket shopping",
+        "Fresh produce",
+        "Snacks and drinks",
+    ],
+    "Transport": [
+        "Gas refill",
+        "Uber ride",
+        "Monthly metro pass",
+        "Parking fee",
+    ],
+    "Utilities": [
+        "Electricity bill",
+        "Internet bill",
+        "Water bill",
+        "Phone bill",
+    ],
+    "Entertainment": [
+        "Movie tickets",
+        "Streaming subscription",
+        "Concert tickets",
+        "Restaurant dinner",
+    ],
+    "Health": ["Pharmacy", "Doctor visit", "Gym membership", "Vitamins"],
+    "Others": ["Clothes shopping", "Home supplies", "Books", "Gifts"],
+}
+
+# Revenue descriptions by category
+REVENUE_DESCRIPTIONS = {
+    "Salary": ["Monthly salary", "Bonus payment", "Overtime pay"],
+    "Freelance": [
+        "Web design project",
+        "Consulting work",
+        "Logo design",
+        "Content writing",
+    ],
+    "Investments": ["Stock dividends", "Crypto gains", "Interest income"],
+    "Others": ["Gift received", "Refund", "Cashback"],
+}
+
+# Amount ranges by category
+EXPENSE_AMOUNTS = {
+    "Grocery": (30, 150),
+    "Transport": (10, 80),
+    "Utilities": (50, 200),
+    "Entertainment": (20, 100),
+    "Health": (15, 150),
+    "Others": (20, 100),
+}
+
+REVENUE_AMOUNTS = {
+    "Salary": (2500, 4000),
+    "Freelance": (200, 1500),
+    "Investments": (50, 500),
+    "Others": (50, 300),
+}
+
+
+def create_categories():
+    # Create expense categories
+    expense_categories = [
+        Category(name="Grocery", type="expense", icon=""),
+        Category(name="Transport", type="expense", icon=""),
+        Category(name="Utilities", type="expense", icon=""),
+        Category(name="Entertainment", type="expense", icon=""),
+        Category(name="Health", type="expense", icon=""),
+        Category(name="Others", type="expense", icon=""),
+    ]
+
+    # Create revenue categories
+    revenue_categories = [
+        Category(name="Salary", type="revenue", icon=""),
+        Category(name="Freelance", type="revenue", icon=""),
+        Category(name="Investments", type="revenue", icon=""),
+        Category(name="Others", type="revenue", icon=""),
+    ]
+
+    for category in expense_categories + revenue_categories:
+        db.session.add(category)
+
+    db.session.commit()
+
+    return expense_categories, revenue_categories
+
 
 def seed_database():
     with app.app_context():
@@ -23,105 +113,30 @@ def seed_database():
         db.session.commit()
 
         print("Creating categories...")
-        # Create expense categories
-        expense_categories = [
-            Category(name="Grocery", type="expense", icon=""),
-            Category(name="Transport", type="expense", icon=""),
-            Category(name="Utilities", type="expense", icon=""),
-            Category(name="Entertainment", type="expense", icon=""),
-            Category(name="Health", type="expense", icon=""),
-            Category(name="Others", type="expense", icon=""),
-        ]
-
-        # Create revenue categories
-        revenue_categories = [
-            Category(name="Salary", type="revenue", icon=""),
-            Category(name="Freelance", type="revenue", icon=""),
-            Category(name="Investments", type="revenue", icon=""),
-            Category(name="Others", type="revenue", icon=""),
-        ]
-
-        for category in expense_categories + revenue_categories:
-            db.session.add(category)
-
-        db.session.commit()
+        expense_categories, revenue_categories = create_categories()
 
         print("Creating sample transactions...")
         # Create sample transactions for the last 6 months
         today = datetime.now()
         transactions = []
 
-        # Expense descriptions by category
-        expense_descriptions = {
-            "Grocery": [
-                "Weekly groceries",
-                "Supermarket shopping",
-                "Fresh produce",
-                "Snacks and drinks",
-            ],
-            "Transport": [
-                "Gas refill",
-                "Uber ride",
-                "Monthly metro pass",
-                "Parking fee",
-            ],
-            "Utilities": [
-                "Electricity bill",
-                "Internet bill",
-                "Water bill",
-                "Phone bill",
-            ],
-            "Entertainment": [
-                "Movie tickets",
-                "Streaming subscription",
-                "Concert tickets",
-                "Restaurant dinner",
-            ],
-            "Health": ["Pharmacy", "Doctor visit", "Gym membership", "Vitamins"],
-            "Others": ["Clothes shopping", "Home supplies", "Books", "Gifts"],
-        }
-
-        # Revenue descriptions by category
-        revenue_descriptions = {
-            "Salary": ["Monthly salary", "Bonus payment", "Overtime pay"],
-            "Freelance": [
-                "Web design project",
-                "Consulting work",
-                "Logo design",
-                "Content writing",
-            ],
-            "Investments": ["Stock dividends", "Crypto gains", "Interest income"],
-            "Others": ["Gift received", "Refund", "Cashback"],
-        }
-
         # Generate expenses
         for i in range(150):
             days_ago = random.randint(0, 180)
             transaction_date = today - timedelta(days=days_ago)
 
             category = random.choice(expense_categories)
-            description = random.choice(expense_descriptions[category.name])
+            description = random.choice(EXPENSE_DESCRIPTIONS[category.name])
 
             # Amount varies by category
-            if category.name == "Grocery":
-                amount = round(random.uniform(30, 150), 2)
-            elif category.name == "Transport":
-                amount = round(random.uniform(10, 80), 2)
-            elif category.name == "Utilities":
-                amount = round(random.uniform(50, 200), 2)
-            elif category.name == "Entertainment":
-                amount = round(random.uniform(20, 100), 2)
-            elif category.name == "Health":
-                amount = round(random.uniform(15, 150), 2)
-            else:
-                amount = round(random.uniform(20, 100), 2)
+            amount = round(random.uniform(*EXPENSE_AMOUNTS[category.name]), 2)
 
             transaction = Transaction(
                 user_id=demo_user.id,
                 date=transaction_date.date(),
                 category_id=category.id,
                 description=description,
-                amount=amount,
+                amount_cents=to_minor(amount),
                 type="expense",
             )
             transactions.append(transaction)
@@ -132,24 +147,17 @@ def seed_database():
             transaction_date = today - timedelta(days=days_ago)
 
             category = random.choice(revenue_categories)
-            description = random.choice(revenue_descriptions[category.name])
+            description = random.choice(REVENUE_DESCRIPTIONS[category.name])
 
             # Amount varies by category
-            if category.name == "Salary":
-                amount = round(random.uniform(2500, 4000), 2)
-            elif category.name == "Freelance":
-                amount = round(random.uniform(200, 1500), 2)
-            elif category.name == "Investments":
-                amount = round(random.uniform(50, 500), 2)
-            else:
-                amount = round(random.uniform(50, 300), 2)
+            amount = round(random.uniform(*REVENUE_AMOUNTS[category.name]), 2)
 
             transaction = Transaction(
                 user_id=demo_user.id,
                 date=transaction_date.date(),
                 category_id=category.id,
                 description=description,
-                amount=amount,
+                amount_cents=to_minor(amount),
                 type="revenue",
             )
             transactions.append(transaction)
@@ -163,7 +171,7 @@ def seed_database():
                 date=salary_date.date(),
                 category_id=salary_category.id,
                 description="Monthly salary",
-                amount=3500.00,
+                amount_cents=350000,
                 type="revenue",
             )
             transactions.append(salary_transaction)
@@ -174,6 +182,13 @@ def seed_database():
 
         db.session.commit()
 
+        print("Building transaction rollups...")
+        rollups.rebuild()
+
+        if search.is_supported():
+            print("Building the search index...")
+            search.create_index()
+
         print(f"✅ Database seeded successfully!")
         print(f"   - Created user: demo / demo123")
         print(f"   - Created {len(expense_categories)} expense categories")
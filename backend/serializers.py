@@ -0,0 +1,57 @@
+from datetime import date
+
+from money import to_major
+
+
+def serialize_transaction(transaction, categories):
+    category = categories[transaction.category_id]
+    return {
+        "id": transaction.id,
+        "date": transaction.date.strftime("%Y-%m-%d"),
+        "category_id": transaction.category_id,
+        "category_name": category["name"],
+        "category_icon": category["icon"],
+        "description": transaction.description,
+        "amount": to_major(transaction.amount_cents),
+        "type": transaction.type,
+    }
+
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+TYPE_CODES = {"expense": 0, "revenue": 1}
+
+
+# format=columnar: one array per field instead of one object per row, dates
+# as days since 1970-01-01, amounts in integer cents and types as 0/1
+# (expense/revenue), plus each referenced category once. Rows are
+# (id, date, category_id, description, amount_cents, type) tuples.
+def serialize_columnar(rows, categories):
+    ids = []
+    dates = []
+    category_ids = []
+    descriptions = []
+    amounts = []
+    types = []
+    for transaction_id, day, category_id, description, cents, kind in rows:
+        ids.append(transaction_id)
+        dates.append(day.toordinal() - EPOCH_ORDINAL)
+        category_ids.append(category_id)
+        descriptions.append(description)
+        amounts.append(cents)
+        types.append(TYPE_CODES[kind])
+
+    return {
+        "ids": ids,
+        "dates": dates,
+        "category_ids": category_ids,
+        "descriptions": descriptions,
+        "amounts": amounts,
+        "types": types,
+        "categories": {
+            category_id: {
+                "name": categories[category_id]["name"],
+                "icon": categories[category_id]["icon"],
+            }
+            for category_id in set(category_ids)
+        },
+    }
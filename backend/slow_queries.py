@@ -0,0 +1,178 @@
+import logging
+import sys
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from listing import encode_cursor
+from metrics import current_route
+from sqlalchemy import event
+
+logger = logging.getLogger("slow_queries")
+
+FULL_SCAN_MARKERS = {
+    # SQLite < 3.36 says "SCAN TABLE <name>", newer versions "SCAN <name>"
+    "sqlite": ("SCAN {table}", "SCAN TABLE {table}"),
+    "postgresql": ("Seq Scan on {table}",),
+}
+
+
+def explainable(statement):
+    return statement.lstrip().upper().startswith(("SELECT", "WITH"))
+
+
+# Runs the dialect's EXPLAIN on a fresh DBAPI cursor so it neither disturbs
+# the caller's cursor nor re-enters the engine event hooks
+def explain(cursor, dialect_name, statement, parameters):
+    prefix = "EXPLAIN QUERY PLAN " if dialect_name == "sqlite" else "EXPLAIN "
+    plan_cursor = cursor.connection.cursor()
+    try:
+        plan_cursor.execute(prefix + statement, parameters)
+        rows = plan_cursor.fetchall()
+    finally:
+        plan_cursor.close()
+    # SQLite rows are (id, parent, notused, detail); PostgreSQL rows are (line,)
+    return [str(row[-1]) for row in rows]
+
+
+def full_scans(plan, dialect_name, tables):
+    scans = []
+    for line in plan:
+        step = line.strip()
+        for table in tables:
+            for marker in FULL_SCAN_MARKERS.get(dialect_name, ()):
+                prefix = marker.format(table=table)
+                if step == prefix or step.startswith(prefix + " "):
+                    scans.append(step)
+    return scans
+
+
+# Logs statements slower than threshold_ms with their bound parameters, the
+# originating route and the query plan
+def init_app(app, engine, threshold_ms):
+    threshold = threshold_ms / 1000
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_statement(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def check_statement(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["slow_query_started"].pop()
+        if elapsed < threshold:
+            return
+
+        plan = []
+        if not executemany and explainable(statement):
+            try:
+                plan = explain(cursor, conn.dialect.name, statement, parameters)
+            except Exception as e:
+                plan = [f"EXPLAIN failed: {e}"]
+
+        logger.warning(
+            "Slow query (%.1f ms) on %s\n%s\nParameters: %r\nPlan:\n  %s",
+            elapsed * 1000,
+            current_route(),
+            statement,
+            parameters,
+            "\n  ".join(plan) or "(not available)",
+        )
+
+    @event.listens_for(engine, "handle_error")
+    def discard_statement(context):
+        if context.connection is not None:
+            started = context.connection.info.get("slow_query_started")
+            if started:
+                started.pop()
+
+
+# Records the plan of every SELECT issued inside the block as
+# (statement, parameters, plan) tuples
+@contextmanager
+def capture_plans(engine):
+    plans = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and explainable(statement):
+            plans.append(
+                (
+                    statement,
+                    parameters,
+                    explain(cursor, conn.dialect.name, statement, parameters),
+                )
+            )
+
+    event.listen(engine, "after_cursor_execute", record)
+    try:
+        yield plans
+    finally:
+        event.remove(engine, "after_cursor_execute", record)
+
+
+# Test helper: issues the request through a Flask test client and fails if
+# any query it runs does a full scan of the given tables
+def assert_no_full_scans(
+    client, engine, url, headers=None, tables=("transactions", "transaction_rollups")
+):
+    with capture_plans(engine) as plans:
+        response = client.get(url, headers=headers)
+    assert response.status_code == 200, f"{url} returned {response.status_code}"
+
+    offenders = []
+    for statement, _, plan in plans:
+        scans = full_scans(plan, engine.dialect.name, tables)
+        if scans:
+            offenders.append(f"{statement}\n  -> {', '.join(scans)}")
+    assert not offenders, f"Full table scan in {url}:\n" + "\n".join(offenders)
+    return plans
+
+
+HOT_QUERIES = [
+    "/api/transactions?limit=50",
+    "/api/transactions?limit=50&cursor={cursor}",
+    "/api/transactions?period=monthly&month={month}&year={year}",
+    "/api/transactions?period=yearly&year={year}",
+    "/api/transactions?type=expense&period=yearly&year={year}",
+    "/api/transactions?category_id=1&period=yearly&year={year}",
+    "/api/analytics/summary?period=monthly&month={month}&year={year}",
+    "/api/analytics/summary?period=yearly&year={year}",
+    "/api/analytics/charts?period=monthly&month={month}&year={year}",
+    "/api/analytics/charts?period=yearly&year={year}",
+]
+
+
+# HOT_QUERIES for the given day; the cursor page continues from that day
+def hot_query_urls(today):
+    cursor = encode_cursor(SimpleNamespace(date=today, id=2**31 - 1))
+    return [
+        url.format(month=today.month, year=today.year, cursor=cursor)
+        for url in HOT_QUERIES
+    ]
+
+
+if __name__ == "__main__":
+    from datetime import date
+
+    from app import app
+    from models import db
+
+    today = date.today()
+    client = app.test_client()
+    response = client.post(
+        "/api/login", json={"username": "demo", "password": "demo123"}
+    )
+    headers = {"Authorization": f"Bearer {response.get_json()['token']}"}
+
+    with app.app_context():
+        engine = db.engine
+
+    failures = 0
+    for url in hot_query_urls(today):
+        try:
+            assert_no_full_scans(client, engine, url, headers)
+            print(f"   ✅ {url}")
+        except AssertionError as e:
+            failures += 1
+            print(f"   ❌ {e}")
+
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,61 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# The app reads its configuration at import time: point it at a throwaway
+# database and keep hashing, report workers and rate limits out of the way
+DATA_DIR = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DATA_DIR, 'test.db')}"
+os.environ["REPORTS_DIR"] = os.path.join(DATA_DIR, "reports")
+os.environ["PASSWORD_HASH_WORKERS"] = "0"
+os.environ["PASSWORD_HASH_ITERATIONS"] = "1000"
+os.environ["REPORT_WORKERS"] = "0"
+os.environ["RATE_LIMIT_ENABLED"] = "0"
+os.environ["SLOW_QUERY_MS"] = "0"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app as flask_app  # noqa: E402
+import search  # noqa: E402
+from hashing import password_hasher  # noqa: E402
+from models import Category, User, db  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    with flask_app.app_context():
+        db.create_all()
+        db.session.add_all(
+            [
+                Category(name="Grocery", type="expense", icon=""),
+                Category(name="Transport", type="expense", icon=""),
+                Category(name="Salary", type="revenue", icon=""),
+            ]
+        )
+        db.session.add(
+            User(
+                username="demo",
+                email="demo@example.com",
+                password_hash=password_hasher.hash("demo123"),
+            )
+        )
+        db.session.commit()
+        search.create_index()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(client):
+    response = client.post(
+        "/api/login", json={"username": "demo", "password": "demo123"}
+    )
+    return {"Authorization": f"Bearer {response.json['token']}"}
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+import changes
+from models import TransactionTombstone, User, db
+
+TRANSACTION = {
+    "date": "2024-01-15",
+    "category_id": 1,
+    "description": "Lunch",
+    "amount": 12.5,
+    "type": "expense",
+}
+
+
+def second_user_headers(client):
+    client.post(
+        "/api/register",
+        json={
+            "username": "other",
+            "email": "other@example.com",
+            "password": "other123",
+        },
+    )
+    response = client.post(
+        "/api/login", json={"username": "other", "password": "other123"}
+    )
+    return {"Authorization": f"Bearer {response.json['token']}"}
+
+
+def create(client, headers):
+    response = client.post("/api/transactions", json=TRANSACTION, headers=headers)
+    assert response.status_code == 201
+    return response.json["transaction"]["id"]
+
+
+def changes_since(client, headers, since):
+    response = client.get(f"/api/transactions/changes?since={since}", headers=headers)
+    assert response.status_code == 200
+    return response.json
+
+
+# SQLite hands the id of a deleted last row to the next insert, whoever owns it
+def test_reused_id_keeps_each_users_tombstone(client, auth_headers):
+    other_headers = second_user_headers(client)
+    cursor = changes_since(client, auth_headers, 0)["cursor"]
+
+    transaction_id = create(client, auth_headers)
+    client.delete(f"/api/transactions/{transaction_id}", headers=auth_headers)
+    assert create(client, other_headers) == transaction_id
+    client.delete(f"/api/transactions/{transaction_id}", headers=other_headers)
+
+    assert changes_since(client, auth_headers, cursor)["deleted"] == [transaction_id]
+
+
+def test_cursor_older_than_pruned_tombstones_resets(client, auth_headers):
+    cursor = changes_since(client, auth_headers, 0)["cursor"]
+    transaction_id = create(client, auth_headers)
+    client.delete(f"/api/transactions/{transaction_id}", headers=auth_headers)
+    since_delete = changes_since(client, auth_headers, cursor)["cursor"]
+
+    TransactionTombstone.query.update(
+        {"deleted_at": datetime.utcnow() - changes.retention - timedelta(days=1)}
+    )
+    assert changes.prune() == 1
+    db.session.commit()
+
+    user = User.query.filter_by(username="demo").one()
+    assert user.changes_horizon == since_delete
+    assert changes_since(client, auth_headers, cursor)["reset"] is True
+    assert changes_since(client, auth_headers, since_delete)["reset"] is False
@@ -0,0 +1,94 @@
+from datetime import date
+
+import pytest
+from auth_cache import token_cache
+from categories import invalidate_category_map
+from models import Category, Transaction, User, db
+from sqlalchemy import event
+
+
+def add_transactions(count):
+    user = User.query.filter_by(username="demo").one()
+    category_ids = [c.id for c in Category.query.all()]
+    db.session.add_all(
+        [
+            Transaction(
+                user_id=user.id,
+                date=date(2024, 1, 1 + i % 28),
+                category_id=category_ids[i % len(category_ids)],
+                description=f"Transaction {i}",
+                amount_cents=100 + i,
+                type="expense",
+            )
+            for i in range(count)
+        ]
+    )
+    db.session.commit()
+
+
+# Statements issued by one listing request, starting from cold caches
+def count_statements(client, headers, path):
+    token_cache.clear()
+    invalidate_category_map()
+    db.session.remove()
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        response = client.get(path, headers=headers)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+    assert response.status_code == 200
+    return len(statements), response
+
+
+@pytest.mark.parametrize(
+    "path", ["/api/transactions", "/api/transactions?format=columnar"]
+)
+def test_listing_statement_count_does_not_grow_with_rows(client, auth_headers, path):
+    add_transactions(1)
+    one_row, response = count_statements(client, auth_headers, path)
+
+    add_transactions(99)
+    many_rows, response = count_statements(client, auth_headers, path)
+
+    transactions = response.json["transactions"]
+    if "columnar" in path:
+        transactions = transactions["ids"]
+    assert len(transactions) == 100
+    assert many_rows == one_row
+
+
+def test_listing_includes_category_details(client, auth_headers):
+    add_transactions(3)
+    response = client.get("/api/transactions", headers=auth_headers)
+
+    names = {t["category_name"] for t in response.json["transactions"]}
+    assert names == {"Grocery", "Transport", "Salary"}
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/api/transactions",
+        "/api/transactions/export",
+        "/api/analytics/summary",
+        "/api/analytics/charts",
+        "/api/dashboard",
+    ],
+)
+@pytest.mark.parametrize(
+    "query, message",
+    [
+        ("period=monthly&month=13", "Month must be between 1 and 12"),
+        ("period=yearly&year=10000", "Year must be between 1900 and 9998"),
+    ],
+)
+def test_out_of_range_period_is_rejected(client, auth_headers, path, query, message):
+    response = client.get(f"{path}?{query}", headers=auth_headers)
+    assert response.status_code == 400
+    assert response.json["message"] == message
@@ -0,0 +1,34 @@
+from datetime import date
+
+import pytest
+from models import db
+from slow_queries import (
+    HOT_QUERIES,
+    assert_no_full_scans,
+    capture_plans,
+    hot_query_urls,
+)
+
+TODAY = date.today()
+
+
+@pytest.mark.parametrize("url", hot_query_urls(TODAY), ids=HOT_QUERIES)
+def test_hot_query_has_no_full_scan(client, auth_headers, url):
+    assert_no_full_scans(client, db.engine, url, auth_headers)
+
+
+# Not a full scan but just as bad: a cursor predicate the planner cannot use
+# as a date range reads every earlier row of the user
+def test_cursor_page_seeks_on_date(client, auth_headers):
+    url = next(url for url in hot_query_urls(TODAY) if "cursor=" in url)
+    with capture_plans(db.engine) as plans:
+        response = client.get(url, headers=auth_headers)
+    assert response.status_code == 200
+
+    steps = [
+        step
+        for statement, _, plan in plans
+        if "FROM transactions" in statement
+        for step in plan
+    ]
+    assert any("date<?" in step for step in steps), steps
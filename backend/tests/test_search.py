@@ -0,0 +1,48 @@
+import search
+from models import db
+from sqlalchemy import text
+
+TRANSACTION = {
+    "date": "2024-01-15",
+    "category_id": 1,
+    "description": "Weekly groceries",
+    "amount": 42,
+    "type": "expense",
+}
+
+
+def search_for(client, headers, q):
+    return client.get(f"/api/transactions/search?q={q}", headers=headers)
+
+
+def test_search_matches_word_prefixes(client, auth_headers):
+    client.post("/api/transactions", json=TRANSACTION, headers=auth_headers)
+    client.post(
+        "/api/transactions",
+        json={**TRANSACTION, "description": "Restaurant dinner"},
+        headers=auth_headers,
+    )
+
+    response = search_for(client, auth_headers, "gro")
+    assert response.status_code == 200
+    assert [t["description"] for t in response.json["transactions"]] == [
+        "Weekly groceries"
+    ]
+    assert search_for(client, auth_headers, "rest din").json["transactions"]
+
+
+def test_missing_index_is_reported_and_ensure_index_backfills(client, auth_headers):
+    # As on a database made by create_all alone
+    for trigger in ("insert", "delete", "update"):
+        db.session.execute(text(f"DROP TRIGGER {search.FTS_TABLE}_{trigger}"))
+    db.session.execute(text(f"DROP TABLE {search.FTS_TABLE}"))
+    db.session.commit()
+    client.post("/api/transactions", json=TRANSACTION, headers=auth_headers)
+
+    response = search_for(client, auth_headers, "gro")
+    assert response.status_code == 503
+
+    search.ensure_index()
+    response = search_for(client, auth_headers, "gro")
+    assert response.status_code == 200
+    assert len(response.json["transactions"]) == 1
@@ -0,0 +1,92 @@
+import json
+
+TRANSACTION = {
+    "date": "2024-01-15",
+    "category_id": 1,
+    "description": "Lunch",
+    "amount": 12.5,
+    "type": "expense",
+}
+
+
+def test_create_rejects_non_numeric_amount(client, auth_headers):
+    response = client.post(
+        "/api/transactions", json={**TRANSACTION, "amount": "abc"}, headers=auth_headers
+    )
+    assert response.status_code == 400
+    assert response.json["message"] == "Amount must be a number"
+
+
+def test_update_rejects_non_numeric_amount(client, auth_headers):
+    created = client.post("/api/transactions", json=TRANSACTION, headers=auth_headers)
+    transaction_id = created.json["transaction"]["id"]
+
+    response = client.put(
+        f"/api/transactions/{transaction_id}",
+        json={"amount": "NaN"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 400
+    assert response.json["message"] == "Amount must be a number"
+
+
+def test_register_rejects_non_numeric_threshold(client):
+    response = client.post(
+        "/api/register",
+        json={
+            "username": "other",
+            "email": "other@example.com",
+            "password": "other123",
+            "monthly_spending_threshold": "lots",
+        },
+    )
+    assert response.status_code == 400
+    assert response.json["message"] == "Monthly spending threshold must be a number"
+
+
+def test_bulk_csv_upload_accepts_byte_order_mark(client, auth_headers):
+    body = (
+        "\ufeffdate,category_id,description,amount,type\r\n"
+        "2024-01-15,1,Groceries,42.10,expense\r\n"
+        "2024-01-16,3,Salary,2500,revenue\r\n"
+    ).encode("utf-8")
+    response = client.post(
+        "/api/transactions/bulk",
+        data=body,
+        headers={**auth_headers, "Content-Type": "text/csv"},
+    )
+    assert response.status_code == 201
+    assert response.json["created"] == 2
+    assert response.json["errors"] == []
+
+
+def test_dashboard_range_limits_recent_transactions(client, auth_headers):
+    for day, amount in [("2024-01-15", 10), ("2024-03-15", 99)]:
+        client.post(
+            "/api/transactions",
+            json={**TRANSACTION, "date": day, "amount": amount},
+            headers=auth_headers,
+        )
+
+    response = client.get(
+        "/api/dashboard?period=yearly&year=2024&start=2024-01-01&end=2024-01-31",
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert [t["date"] for t in response.json["transactions"]] == ["2024-01-15"]
+    assert response.json["summary"]["total_expenses"] == 10
+
+
+def test_ndjson_export_matches_listing(client, auth_headers):
+    client.post(
+        "/api/transactions",
+        json={**TRANSACTION, "description": "Café crème"},
+        headers=auth_headers,
+    )
+
+    export = client.get("/api/transactions/export?format=ndjson", headers=auth_headers)
+    listing = client.get("/api/transactions", headers=auth_headers)
+    assert export.status_code == 200
+    lines = export.data.decode().splitlines()
+    assert [json.loads(line) for line in lines] == listing.json["transactions"]
+    assert "Café crème" in lines[0]
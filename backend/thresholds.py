@@ -0,0 +1,52 @@
+from models import MonthlyTotal, User, db
+from money import to_major
+from sqlalchemy import select
+
+
+def status_payload(spent_cents, threshold_cents):
+    return {
+        "spent": to_major(spent_cents),
+        "threshold": to_major(threshold_cents),
+        "percent_used": round(spent_cents * 100 / threshold_cents, 1),
+        "crossed": spent_cents > threshold_cents,
+    }
+
+
+# Threshold status for the month containing day, read from the running total
+# (one primary-key lookup); None when the user has no threshold. Called after
+# rollups.apply in the same DB transaction, so it includes that change.
+def status(user, day):
+    threshold_cents = user.monthly_spending_threshold_cents
+    if not threshold_cents:
+        return None
+
+    spent_cents = db.session.scalar(
+        select(MonthlyTotal.expense_cents).where(
+            MonthlyTotal.user_id == user.id,
+            MonthlyTotal.year == day.year,
+            MonthlyTotal.month == day.month,
+        )
+    )
+    return {
+        "year": day.year,
+        "month": day.month,
+        **status_payload(spent_cents or 0, threshold_cents),
+    }
+
+
+# Users whose expenses for the month exceed their threshold, most over first;
+# reads one monthly_totals row per active user instead of the transactions
+def over_threshold_statement(year, month):
+    threshold = User.monthly_spending_threshold_cents
+    spent = MonthlyTotal.expense_cents
+    return (
+        select(User.id, User.username, User.email, threshold, spent)
+        .join(MonthlyTotal, MonthlyTotal.user_id == User.id)
+        .where(
+            MonthlyTotal.year == year,
+            MonthlyTotal.month == month,
+            threshold > 0,
+            spent > threshold,
+        )
+        .order_by((spent * 1.0 / threshold).desc(), User.id)
+    )
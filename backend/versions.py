@@ -0,0 +1,50 @@
+import hashlib
+
+from models import User, db
+from sqlalchemy import select, update
+
+user_table = User.__table__
+
+
+# Every user has a data version that goes up with each transaction or category
+# change they can see. It is bumped in the same DB transaction as the change,
+# so every worker process agrees on it.
+def version_statement(user_id):
+    return select(user_table.c.data_version).where(user_table.c.id == user_id)
+
+
+def current_version(user_id):
+    return db.session.execute(version_statement(user_id)).scalar()
+
+
+# Returns the new version, which also serves as the change sequence number
+# stamped on the rows the change writes (see changes.py). It is remembered on
+# the session so live events published on commit carry it (see events.py).
+def bump(user_id):
+    version = db.session.execute(
+        update(user_table)
+        .where(user_table.c.id == user_id)
+        .values(data_version=user_table.c.data_version + 1)
+        .returning(user_table.c.data_version)
+    ).scalar()
+    db.session.info.setdefault("data_versions", {})[user_id] = version
+    return version
+
+
+# Categories are shared, so a category change is a new version for everyone
+def bump_all():
+    db.session.execute(
+        update(user_table).values(data_version=user_table.c.data_version + 1)
+    )
+
+
+# Weak entity tag for a read: the same user, version, path and query
+# parameters (as (key, value) pairs) always produce the same response body
+def make_etag(user_id, version, path, params):
+    query = "&".join(f"{key}={value}" for key, value in sorted(params))
+    digest = hashlib.sha1(f"{user_id}|{path}?{query}".encode()).hexdigest()[:16]
+    return f"{version}-{digest}"
+
+
+def etag(user_id, path, args):
+    return make_etag(user_id, current_version(user_id), path, args.items(multi=True))
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from "react";
+import React, { useState, useEffect, useRef } from "react";
 import { useNavigate, Link } from "react-router-dom";
 import Navigation from "../components/Navigation";
 import {
@@ -14,9 +14,9 @@ import {
   ResponsiveContainer,
 } from "recharts";
 import {
-  getTransactions,
-  getSummary,
-  getChartData,
+  getDashboard,
+  subscribeToEvents,
+  applySummaryChanges,
   getCategories,
   createTransaction,
   updateTransaction,
@@ -53,6 +53,9 @@ const Dashboard = () => {
   });
   const [error, setError] = useState("");
   const [quickAddError, setQuickAddError] = useState("");
+  // Data version the shown summary was loaded at; live events at or below it
+  // are already included
+  const summaryVersion = useRef(0);
 
   // Update date/time every second
   useEffect(() => {
@@ -67,18 +70,37 @@ const Dashboard = () => {
     loadCategories();
   }, [filters]);
 
+  // Keep the summary current while transactions change elsewhere (another
+  // tab or device on the same account)
+  useEffect(() => {
+    return subscribeToEvents((name, data) => {
+      if (name === "summary" && data.version > summaryVersion.current) {
+        summaryVersion.current = data.version;
+        setSummary((current) =>
+          applySummaryChanges(current, data.changes, filters),
+        );
+      } else if (name === "resync") {
+        loadData();
+      } else if (
+        name === "ready" &&
+        summaryVersion.current &&
+        data.version > summaryVersion.current
+      ) {
+        // Reconnected after missing events
+        loadData();
+      }
+    });
+  }, [filters]);
+
   const loadData = async () => {
     try {
       setLoading(true);
-      const [summaryData, transactionsData, chartsData] = await Promise.all([
-        getSummary(filters),
-        getTransactions(filters),
-        getChartData(filters),
-      ]);
-
-      setSummary(summaryData);
-      setTransactions(transactionsData.transactions);
-      setChartData(chartsData);
+      const dashboardData = await getDashboard({ ...filters, limit: 5 });
+
+      summaryVersion.current = dashboardData.version;
+      setSummary(dashboardData.summary);
+      setTransactions(dashboardData.transactions);
+      setChartData(dashboardData.charts);
     } catch (err) {
       console.error("Error loading data:", err);
       setError("Failed to load data");
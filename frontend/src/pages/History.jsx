@@ -3,6 +3,8 @@ import { useNavigate } from "react-router-dom";
 import Navigation from "../components/Navigation";
 import {
   getTransactions,
+  getTransactionChanges,
+  applyTransactionChanges,
   getCategories,
   createTransaction,
   updateTransaction,
@@ -13,6 +15,7 @@ const History = () => {
   const navigate = useNavigate();
   const [loading, setLoading] = useState(true);
   const [transactions, setTransactions] = useState([]);
+  const [changeCursor, setChangeCursor] = useState(null);
   const [categories, setCategories] = useState([]);
   const [filters, setFilters] = useState({
     period: "yearly",
@@ -41,8 +44,15 @@ const History = () => {
   const loadData = async () => {
     try {
       setLoading(true);
-      const transactionsData = await getTransactions(filters);
+      // Taken before the list so a change made in between is synced again
+      // rather than missed
+      const { cursor } = await getTransactionChanges();
+      const transactionsData = await getTransactions({
+        ...filters,
+        format: "columnar",
+      });
       setTransactions(transactionsData.transactions);
+      setChangeCursor(cursor);
     } catch (err) {
       console.error("Error loading data:", err);
       setError("Failed to load data");
@@ -51,6 +61,24 @@ const History = () => {
     }
   };
 
+  // After an edit, fetch only what changed since the last load or sync
+  const syncChanges = async () => {
+    try {
+      const changes = await getTransactionChanges(changeCursor);
+      if (changes.reset) {
+        loadData();
+        return;
+      }
+      setTransactions((current) =>
+        applyTransactionChanges(current, changes, filters),
+      );
+      setChangeCursor(changes.cursor);
+    } catch (err) {
+      console.error("Error syncing changes:", err);
+      loadData();
+    }
+  };
+
   const loadCategories = async () => {
     try {
       const data = await getCategories();
@@ -89,7 +117,7 @@ const History = () => {
     if (window.confirm("Are you sure you want to delete this transaction?")) {
       try {
         await deleteTransaction(id);
-        loadData();
+        syncChanges();
       } catch (err) {
         console.error("Error deleting transaction:", err);
         alert("Failed to delete transaction");
@@ -108,7 +136,7 @@ const History = () => {
         await updateTransaction(selectedTransaction.id, formData);
       }
       setShowModal(false);
-      loadData();
+      syncChanges();
     } catch (err) {
       setError(err.response?.data?.message || "Failed to save transaction");
     }
@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from "react";
 import { useNavigate } from "react-router-dom";
 import Navigation from "../components/Navigation";
-import { getTransactions, getSummary } from "../services/api";
+import { exportTransactions, getSummary } from "../services/api";
 
 const Profile = () => {
   const navigate = useNavigate();
@@ -38,178 +38,51 @@ const Profile = () => {
     }).format(amount);
   };
 
-  const exportTransactions = async () => {
-    try {
-      let filters = {};
-
-      if (exportFormat === "monthly") {
-        filters = {
-          period: "monthly",
-          month: new Date().getMonth() + 1,
-          year: new Date().getFullYear(),
-        };
-      } else if (exportFormat === "yearly") {
-        filters = {
-          period: "yearly",
-          year: new Date().getFullYear(),
-        };
-      }
-
-      const transactionsData = await getTransactions(filters);
-      const transactions = transactionsData.transactions;
-
-      if (transactions.length === 0) {
-        alert("No transactions to export");
-        return;
-      }
-
-      // Create CSV content
-      const headers = ["Date", "Category", "Description", "Amount", "Type"];
-      const csvData = transactions.map((t) => [
-        t.date,
-        t.category_name,
-        `"${t.description}"`, // Wrap in quotes to handle commas
-        t.amount,
-        t.type,
-      ]);
-
-      const csvContent = [
-        headers.join(","),
-        ...csvData.map((row) => row.join(",")),
-      ].join("\n");
-
-      // Download CSV
-      const blob = new Blob([csvContent], { type: "text/csv;charset=utf-8;" });
-      const link = document.createElement("a");
-      const url = URL.createObjectURL(blob);
-      link.setAttribute("href", url);
-      link.setAttribute(
-        "download",
-        `spendwise_${exportFormat}_${new Date().toISOString().split("T")[0]}.csv`,
-      );
-      link.style.visibility = "hidden";
-      document.body.appendChild(link);
-      link.click();
-      document.body.removeChild(link);
+  const getExportFilters = (type) => {
+    const filters = type ? { type } : {};
 
-      alert(`Successfully exported ${transactions.length} transactions!`);
-    } catch (err) {
-      console.error("Error exporting transactions:", err);
-      alert("Failed to export transactions");
+    if (exportFormat === "monthly") {
+      filters.period = "monthly";
+      filters.month = new Date().getMonth() + 1;
+      filters.year = new Date().getFullYear();
+    } else if (exportFormat === "yearly") {
+      filters.period = "yearly";
+      filters.year = new Date().getFullYear();
     }
+
+    return filters;
   };
 
-  const exportExpensesOnly = async () => {
+  // The CSV is built and streamed by the server; we only save the file
+  const downloadExport = async (type, prefix, label) => {
     try {
-      let filters = { type: "expense" };
-
-      if (exportFormat === "monthly") {
-        filters.period = "monthly";
-        filters.month = new Date().getMonth() + 1;
-        filters.year = new Date().getFullYear();
-      } else if (exportFormat === "yearly") {
-        filters.period = "yearly";
-        filters.year = new Date().getFullYear();
-      }
-
-      const transactionsData = await getTransactions(filters);
-      const transactions = transactionsData.transactions;
-
-      if (transactions.length === 0) {
-        alert("No expense transactions to export");
-        return;
-      }
-
-      const headers = ["Date", "Category", "Description", "Amount"];
-      const csvData = transactions.map((t) => [
-        t.date,
-        t.category_name,
-        `"${t.description}"`,
-        t.amount,
-      ]);
-
-      const csvContent = [
-        headers.join(","),
-        ...csvData.map((row) => row.join(",")),
-      ].join("\n");
-
-      const blob = new Blob([csvContent], { type: "text/csv;charset=utf-8;" });
+      const blob = await exportTransactions(getExportFilters(type), "csv");
       const link = document.createElement("a");
       const url = URL.createObjectURL(blob);
       link.setAttribute("href", url);
       link.setAttribute(
         "download",
-        `spendwise_expenses_${exportFormat}_${new Date().toISOString().split("T")[0]}.csv`,
+        `${prefix}_${exportFormat}_${new Date().toISOString().split("T")[0]}.csv`,
       );
       link.style.visibility = "hidden";
       document.body.appendChild(link);
       link.click();
       document.body.removeChild(link);
-
-      alert(
-        `Successfully exported ${transactions.length} expense transactions!`,
-      );
+      URL.revokeObjectURL(url);
     } catch (err) {
-      console.error("Error exporting expenses:", err);
-      alert("Failed to export expenses");
+      console.error(`Error exporting ${label}:`, err);
+      alert(`Failed to export ${label}`);
     }
   };
 
-  const exportRevenuesOnly = async () => {
-    try {
-      let filters = { type: "revenue" };
-
-      if (exportFormat === "monthly") {
-        filters.period = "monthly";
-        filters.month = new Date().getMonth() + 1;
-        filters.year = new Date().getFullYear();
-      } else if (exportFormat === "yearly") {
-        filters.period = "yearly";
-        filters.year = new Date().getFullYear();
-      }
-
-      const transactionsData = await getTransactions(filters);
-      const transactions = transactionsData.transactions;
+  const exportAllTransactions = () =>
+    downloadExport(null, "spendwise", "transactions");
 
-      if (transactions.length === 0) {
-        alert("No revenue transactions to export");
-        return;
-      }
+  const exportExpensesOnly = () =>
+    downloadExport("expense", "spendwise_expenses", "expenses");
 
-      const headers = ["Date", "Category", "Description", "Amount"];
-      const csvData = transactions.map((t) => [
-        t.date,
-        t.category_name,
-        `"${t.description}"`,
-        t.amount,
-      ]);
-
-      const csvContent = [
-        headers.join(","),
-        ...csvData.map((row) => row.join(",")),
-      ].join("\n");
-
-      const blob = new Blob([csvContent], { type: "text/csv;charset=utf-8;" });
-      const link = document.createElement("a");
-      const url = URL.createObjectURL(blob);
-      link.setAttribute("href", url);
-      link.setAttribute(
-        "download",
-        `spendwise_revenues_${exportFormat}_${new Date().toISOString().split("T")[0]}.csv`,
-      );
-      link.style.visibility = "hidden";
-      document.body.appendChild(link);
-      link.click();
-      document.body.removeChild(link);
-
-      alert(
-        `Successfully exported ${transactions.length} revenue transactions!`,
-      );
-    } catch (err) {
-      console.error("Error exporting revenues:", err);
-      alert("Failed to export revenues");
-    }
-  };
+  const exportRevenuesOnly = () =>
+    downloadExport("revenue", "spendwise_revenues", "revenues");
 
   if (!user) {
     return (
@@ -375,7 +248,7 @@ const Profile = () => {
             {/* Export Buttons */}
             <div className="grid grid-cols-1 md:grid-cols-3 gap-4">
               <button
-                onClick={exportTransactions}
+                onClick={exportAllTransactions}
                 className="px-6 py-4 bg-primary-600 text-white rounded-2xl font-medium hover:bg-primary-700 transition-all duration-200 flex flex-col items-center space-y-2"
               >
                 <span className="text-2xl">📊</span>
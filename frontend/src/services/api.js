@@ -8,8 +8,16 @@ const api = axios.create({
   headers: {
     "Content-Type": "application/json",
   },
+  // 304 Not Modified is answered from etagCache below
+  validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
 });
 
+// Last response body per GET URL, keyed with the ETag it was served with.
+// Read endpoints answer If-None-Match with an empty 304 when nothing changed.
+const etagCache = new Map();
+
+const cacheKey = (config) => api.getUri(config);
+
 // Add token to requests
 api.interceptors.request.use(
   (config) => {
@@ -17,6 +25,12 @@ api.interceptors.request.use(
     if (token) {
       config.headers.Authorization = `Bearer ${token}`;
     }
+    if (config.method === "get") {
+      const cached = etagCache.get(cacheKey(config));
+      if (cached) {
+        config.headers["If-None-Match"] = cached.etag;
+      }
+    }
     return config;
   },
   (error) => {
@@ -26,10 +40,25 @@ api.interceptors.request.use(
 
 // Handle response errors
 api.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    if (response.config.method !== "get") {
+      return response;
+    }
+    const key = cacheKey(response.config);
+    if (response.status === 304) {
+      const cached = etagCache.get(key);
+      if (cached) {
+        return { ...response, status: 200, data: cached.data };
+      }
+    } else if (response.headers.etag) {
+      etagCache.set(key, { etag: response.headers.etag, data: response.data });
+    }
+    return response;
+  },
   (error) => {
     if (error.response?.status === 401) {
       // Token expired or invalid
+      etagCache.clear();
       localStorage.removeItem("token");
       localStorage.removeItem("user");
       window.location.href = "/";
@@ -68,6 +97,27 @@ export const register = async (
 };
 
 // Transactions
+const MS_PER_DAY = 24 * 60 * 60 * 1000;
+const TRANSACTION_TYPES = ["expense", "revenue"];
+
+// Expands a format=columnar listing back into the usual row objects
+export const decodeColumnar = (columns) =>
+  columns.ids.map((id, i) => {
+    const category = columns.categories[columns.category_ids[i]];
+    return {
+      id,
+      date: new Date(columns.dates[i] * MS_PER_DAY).toISOString().slice(0, 10),
+      category_id: columns.category_ids[i],
+      category_name: category.name,
+      category_icon: category.icon,
+      description: columns.descriptions[i],
+      amount: columns.amounts[i] / 100,
+      type: TRANSACTION_TYPES[columns.types[i]],
+    };
+  });
+
+// Pass format: "columnar" for long histories: the payload is several times
+// smaller and is decoded here into the same shape
 export const getTransactions = async (filters = {}) => {
   const params = new URLSearchParams();
   if (filters.category_id) params.append("category_id", filters.category_id);
@@ -75,11 +125,65 @@ export const getTransactions = async (filters = {}) => {
   if (filters.period) params.append("period", filters.period);
   if (filters.month) params.append("month", filters.month);
   if (filters.year) params.append("year", filters.year);
+  if (filters.limit) params.append("limit", filters.limit);
+  if (filters.cursor) params.append("cursor", filters.cursor);
+  if (filters.format) params.append("format", filters.format);
 
   const response = await api.get(`/transactions?${params.toString()}`);
+  if (filters.format === "columnar") {
+    return {
+      ...response.data,
+      transactions: decodeColumnar(response.data.transactions),
+    };
+  }
   return response.data;
 };
 
+// Changes since a cursor from an earlier call: { transactions, deleted, cursor,
+// reset }. Without a cursor, or when reset is true, reload the list instead.
+export const getTransactionChanges = async (since) => {
+  const params = new URLSearchParams();
+  if (since !== undefined && since !== null) params.append("since", since);
+
+  const response = await api.get(`/transactions/changes?${params.toString()}`);
+  return response.data;
+};
+
+// Whether a year and month fall in the period/month/year filters
+const inPeriod = (year, month, filters) => {
+  const filterYear = Number(filters.year || new Date().getFullYear());
+  if (filters.period === "monthly" && filters.month)
+    return year === filterYear && month === Number(filters.month);
+  if (filters.period === "yearly") return year === filterYear;
+  return true;
+};
+
+const matchesFilters = (transaction, filters) => {
+  if (
+    filters.category_id &&
+    transaction.category_id !== Number(filters.category_id)
+  )
+    return false;
+  if (filters.type && transaction.type !== filters.type) return false;
+  const [year, month] = transaction.date.split("-").map(Number);
+  return inPeriod(year, month, filters);
+};
+
+// Applies getTransactionChanges output to a list loaded with the same
+// filters, keeping the listing's newest-first order
+export const applyTransactionChanges = (
+  transactions,
+  changes,
+  filters = {},
+) => {
+  const removed = new Set(changes.deleted);
+  for (const transaction of changes.transactions) removed.add(transaction.id);
+  return transactions
+    .filter((transaction) => !removed.has(transaction.id))
+    .concat(changes.transactions.filter((t) => matchesFilters(t, filters)))
+    .sort((a, b) => b.date.localeCompare(a.date) || b.id - a.id);
+};
+
 export const createTransaction = async (transactionData) => {
   const response = await api.post("/transactions", transactionData);
   return response.data;
@@ -95,6 +199,42 @@ export const deleteTransaction = async (id) => {
   return response.data;
 };
 
+// Server-side export, returned as a Blob ready to download
+export const exportTransactions = async (filters = {}, format = "csv") => {
+  const params = new URLSearchParams({ format });
+  if (filters.category_id) params.append("category_id", filters.category_id);
+  if (filters.type) params.append("type", filters.type);
+  if (filters.period) params.append("period", filters.period);
+  if (filters.month) params.append("month", filters.month);
+  if (filters.year) params.append("year", filters.year);
+
+  const response = await api.get(`/transactions/export?${params.toString()}`, {
+    responseType: "blob",
+  });
+  return response.data;
+};
+
+// Bulk transactions: accepts an array of transactions or a CSV string
+export const bulkCreateTransactions = async (transactions) => {
+  const response =
+    typeof transactions === "string"
+      ? await api.post("/transactions/bulk", transactions, {
+          headers: { "Content-Type": "text/csv" },
+        })
+      : await api.post("/transactions/bulk", transactions);
+  return response.data;
+};
+
+export const bulkUpdateTransactions = async (transactions) => {
+  const response = await api.put("/transactions/bulk", transactions);
+  return response.data;
+};
+
+export const bulkDeleteTransactions = async (ids) => {
+  const response = await api.delete("/transactions/bulk", { data: { ids } });
+  return response.data;
+};
+
 // Analytics
 export const getSummary = async (filters = {}) => {
   const params = new URLSearchParams();
@@ -111,11 +251,111 @@ export const getChartData = async (filters = {}) => {
   if (filters.period) params.append("period", filters.period);
   if (filters.month) params.append("month", filters.month);
   if (filters.year) params.append("year", filters.year);
+  if (filters.granularity) params.append("granularity", filters.granularity);
+  if (filters.start) params.append("start", filters.start);
+  if (filters.end) params.append("end", filters.end);
 
   const response = await api.get(`/analytics/charts?${params.toString()}`);
   return response.data;
 };
 
+// Dashboard: summary, charts and recent transactions in one request
+export const getDashboard = async (filters = {}) => {
+  const params = new URLSearchParams();
+  if (filters.category_id) params.append("category_id", filters.category_id);
+  if (filters.type) params.append("type", filters.type);
+  if (filters.period) params.append("period", filters.period);
+  if (filters.month) params.append("month", filters.month);
+  if (filters.year) params.append("year", filters.year);
+  if (filters.limit) params.append("limit", filters.limit);
+  if (filters.cursor) params.append("cursor", filters.cursor);
+  if (filters.granularity) params.append("granularity", filters.granularity);
+  if (filters.start) params.append("start", filters.start);
+  if (filters.end) params.append("end", filters.end);
+
+  const response = await api.get(`/dashboard?${params.toString()}`);
+  return { ...response.data, version: versionFromEtag(response.headers.etag) };
+};
+
+// ETags are W/"<data version>-<digest>"; the version orders a loaded response
+// against live events
+const versionFromEtag = (etag) => Number(/(\d+)-/.exec(etag || "")?.[1] || 0);
+
+// Parses one "event: ...\ndata: ..." block of a server-sent event stream
+const parseEvent = (block) => {
+  const event = { name: "message", data: "", retry: null };
+  for (const line of block.split("\n")) {
+    if (line.startsWith("event: ")) event.name = line.slice(7);
+    else if (line.startsWith("data: ")) event.data += line.slice(6);
+    else if (line.startsWith("retry: ")) event.retry = Number(line.slice(7));
+  }
+  return event;
+};
+
+// Live updates from /api/stream: onEvent(name, data) is called for "ready",
+// "summary" and "resync" events and the stream reconnects after errors.
+// fetch is used instead of EventSource so the token travels in the
+// Authorization header. Returns a function that closes the stream.
+export const subscribeToEvents = (onEvent) => {
+  const controller = new AbortController();
+  let retry = 5000;
+
+  const connect = async () => {
+    while (!controller.signal.aborted) {
+      try {
+        const response = await fetch(`${API_BASE_URL}/stream`, {
+          headers: { Authorization: `Bearer ${localStorage.getItem("token")}` },
+          signal: controller.signal,
+        });
+        if (response.status === 401) return;
+        if (response.ok) {
+          const reader = response.body
+            .pipeThrough(new TextDecoderStream())
+            .getReader();
+          let buffer = "";
+          for (;;) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            const blocks = (buffer + value).split("\n\n");
+            buffer = blocks.pop();
+            for (const event of blocks.map(parseEvent)) {
+              if (event.retry) retry = event.retry;
+              if (event.data) onEvent(event.name, JSON.parse(event.data));
+            }
+          }
+        }
+      } catch (err) {
+        if (controller.signal.aborted) return;
+        console.error("Event stream failed:", err);
+      }
+      await new Promise((resolve) => setTimeout(resolve, retry));
+    }
+  };
+
+  connect();
+  return () => controller.abort();
+};
+
+// Applies a "summary" event to a summary loaded for filters; changes outside
+// the period are ignored
+export const applySummaryChanges = (summary, changes, filters = {}) => {
+  let expenses = 0;
+  let revenues = 0;
+  for (const change of changes) {
+    if (!inPeriod(change.year, change.month, filters)) continue;
+    if (change.type === "expense") expenses += change.amount;
+    else revenues += change.amount;
+  }
+  // Amounts are in major units; round back to cents after adding
+  const round = (amount) => Math.round(amount * 100) / 100;
+  return {
+    ...summary,
+    total_expenses: round(summary.total_expenses + expenses),
+    total_revenues: round(summary.total_revenues + revenues),
+    balance: round(summary.balance + revenues - expenses),
+  };
+};
+
 // Categories
 export const getCategories = async (type = null) => {
   const params = type ? `?type=${type}` : "";